@@ -0,0 +1,116 @@
+from sqlalchemy import func, extract
+from models import db, Invoice, InvoiceLine, SalesRollup
+from sales_rollup import covers_range, rollup_filters
+
+TOP_ITEMS_LIMIT = 10
+MAX_TOP_ITEMS_LIMIT = 100
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+def invoice_filters(start, end, order_type=None):
+    filters = []
+    if start:
+        filters.append(Invoice.timestamp >= start)
+    if end:
+        filters.append(Invoice.timestamp < end)
+    if order_type and order_type != 'all':
+        filters.append(Invoice.order_type == order_type)
+    return filters
+
+def line_totals():
+    """Aggregates shared by the item, category and department breakdowns"""
+    return (
+        func.sum(InvoiceLine.quantity),
+        func.sum(InvoiceLine.quantity * InvoiceLine.unit_price),
+        func.count(func.distinct(InvoiceLine.invoice_id))
+    )
+
+def top_items(start, end, order_type=None, by='revenue', limit=TOP_ITEMS_LIMIT):
+    """Best-selling items in the range, ranked by quantity or revenue"""
+    quantity, revenue, orders = line_totals()
+    rows = db.session.query(
+        InvoiceLine.menu_item_id,
+        InvoiceLine.name,
+        func.max(InvoiceLine.product_code),
+        quantity,
+        revenue,
+        orders
+    ).join(Invoice, Invoice.id == InvoiceLine.invoice_id) \
+        .filter(*invoice_filters(start, end, order_type)) \
+        .group_by(InvoiceLine.menu_item_id, InvoiceLine.name) \
+        .order_by((quantity if by == 'quantity' else revenue).desc(), InvoiceLine.name) \
+        .limit(limit).all()
+    return [
+        {
+            'menuItemId': menu_item_id,
+            'name': name,
+            'productCode': product_code,
+            'quantity': int(item_quantity),
+            'revenue': float(item_revenue),
+            'orders': item_orders
+        }
+        for menu_item_id, name, product_code, item_quantity, item_revenue, item_orders in rows
+    ]
+
+def sales_by(column, start, end, order_type=None):
+    """Quantity, revenue and order count per value of an InvoiceLine column.
+
+    Lines keep the category and department the item had when it was sold,
+    so moving an item later does not rewrite past sales.
+    """
+    quantity, revenue, orders = line_totals()
+    rows = db.session.query(column, quantity, revenue, orders) \
+        .join(Invoice, Invoice.id == InvoiceLine.invoice_id) \
+        .filter(*invoice_filters(start, end, order_type)) \
+        .group_by(column) \
+        .order_by(revenue.desc()).all()
+    return [
+        {
+            'name': name or '',
+            'quantity': int(group_quantity),
+            'revenue': float(group_revenue),
+            'orders': group_orders
+        }
+        for name, group_quantity, group_revenue, group_orders in rows
+    ]
+
+def sales_heatmap(start, end, order_type=None, tz_offset=0):
+    """Orders and revenue by local day of week (Monday first) and hour"""
+    orders = [[0] * 24 for _ in range(7)]
+    revenue = [[0.0] * 24 for _ in range(7)]
+
+    if covers_range(start, end, tz_offset):
+        # One row per business day and hour in the range
+        rows = db.session.query(
+            SalesRollup.day,
+            SalesRollup.hour,
+            func.sum(SalesRollup.orders),
+            func.sum(SalesRollup.total)
+        ).filter(*rollup_filters(start, end, order_type)) \
+            .group_by(SalesRollup.day, SalesRollup.hour).all()
+        for day, hour, bucket_orders, bucket_revenue in rows:
+            orders[day.weekday()][hour] += int(bucket_orders)
+            revenue[day.weekday()][hour] += float(bucket_revenue)
+    else:
+        # Bucket by UTC weekday, hour and minute (at most 10080 rows) so the
+        # caller's offset can be applied exactly, including half hours
+        dow_col = extract('dow', Invoice.timestamp)
+        hour_col = extract('hour', Invoice.timestamp)
+        minute_col = extract('minute', Invoice.timestamp)
+        rows = db.session.query(
+            dow_col,
+            hour_col,
+            minute_col,
+            func.count(Invoice.id),
+            func.coalesce(func.sum(Invoice.total), 0)
+        ).filter(*invoice_filters(start, end, order_type)) \
+            .group_by(dow_col, hour_col, minute_col).all()
+        minutes_per_week = 7 * 24 * 60
+        for dow, hour, minute, bucket_orders, bucket_revenue in rows:
+            # dow counts from Sunday; shift to Monday first, then to local time
+            utc_minutes = ((int(dow) + 6) % 7) * 1440 + int(hour) * 60 + int(minute)
+            local_minutes = (utc_minutes + tz_offset) % minutes_per_week
+            local_day, local_hour = local_minutes // 1440, (local_minutes % 1440) // 60
+            orders[local_day][local_hour] += bucket_orders
+            revenue[local_day][local_hour] += float(bucket_revenue)
+
+    return {'days': DAY_NAMES, 'orders': orders, 'revenue': revenue}
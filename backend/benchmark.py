@@ -0,0 +1,322 @@
+"""Dinner-rush load benchmark for the POS backend.
+
+Boots the app on a throwaway SQLite database (or the database in
+--database-url), seeds tables, menu and invoice history, then runs
+simulated terminals that each repeatedly seat a table, send two rounds
+of items to the kitchen, check out, print the bill and refresh the
+dashboard. Reports p50/p95/p99 latency
+and throughput per endpoint.
+
+    python benchmark.py --terminals 8 --seatings 25
+    python benchmark.py --json results.json
+    python benchmark.py --compare results.json   # after changing app.py
+
+Use --url to drive a server that is already running (e.g. gunicorn on
+Postgres) instead of booting one; it must have been seeded with
+--seed-only against the same database first.
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+TABLE_CATEGORIES = ['General', 'Family', 'Mandi', 'Party Hall']
+MENU_CATEGORIES = ['Starters', 'Main Course', 'Biryani', 'Breads', 'Desserts', 'Beverages']
+DEPARTMENTS = ['Kitchen', 'Bar', 'Grill']
+TAX_RATE = 0.05
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--terminals', type=int, default=8, help='concurrent simulated terminals')
+    parser.add_argument('--seatings', type=int, default=20, help='table seatings per terminal')
+    parser.add_argument('--tables', type=int, default=40)
+    parser.add_argument('--menu-items', type=int, default=300)
+    parser.add_argument('--history-days', type=int, default=30, help='days of past invoices to seed')
+    parser.add_argument('--invoices-per-day', type=int, default=150)
+    parser.add_argument('--seed', type=int, default=42, help='random seed, for repeatable runs')
+    parser.add_argument('--database-url', help='defaults to a temporary SQLite file')
+    parser.add_argument('--url', help='benchmark a running server at this base URL instead of booting one')
+    parser.add_argument('--seed-only', action='store_true', help='migrate and seed the database, then exit')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='show changes against results saved with --json')
+    return parser.parse_args()
+
+def seed_database(app, db, args, rng):
+    """Create tables, a menu and invoice history with bulk inserts"""
+    from sqlalchemy import insert
+    from ids import new_id
+    from models import Table, MenuItem, Category, Department, Invoice, InvoiceLine, BillCounter
+    from sales_rollup import rebuild_sales_rollup
+
+    with app.app_context():
+        db.session.execute(insert(Category), [{'id': new_id(), 'name': name} for name in MENU_CATEGORIES])
+        db.session.execute(insert(Department), [{'id': new_id(), 'name': name} for name in DEPARTMENTS])
+        db.session.execute(insert(Table), [
+            {
+                'id': new_id(), 'name': f'T{index + 1}', 'seats': rng.choice([2, 4, 6, 8]),
+                'category': TABLE_CATEGORIES[index % len(TABLE_CATEGORIES)], 'status': 'available'
+            }
+            for index in range(args.tables)
+        ])
+        menu = [
+            {
+                'id': new_id(), 'name': f'Item {index + 1}', 'product_code': f'P{index + 1:04d}',
+                'price': round(rng.uniform(40, 600), 2),
+                'category': MENU_CATEGORIES[index % len(MENU_CATEGORIES)],
+                'department': DEPARTMENTS[index % len(DEPARTMENTS)], 'description': ''
+            }
+            for index in range(args.menu_items)
+        ]
+        db.session.execute(insert(MenuItem), menu)
+
+        invoices, lines = [], []
+        start = datetime.utcnow() - timedelta(days=args.history_days)
+        for number in range(args.history_days * args.invoices_per_day):
+            items = [dict(item, quantity=rng.randint(1, 3)) for item in rng.sample(menu, rng.randint(1, 6))]
+            subtotal = round(sum(item['price'] * item['quantity'] for item in items), 2)
+            tax = round(subtotal * TAX_RATE, 2)
+            invoice_id = new_id()
+            invoices.append({
+                'id': invoice_id, 'bill_number': f'BILL-{number + 1:06d}',
+                'order_type': rng.choice(['dine-in', 'takeaway']), 'table_name': None,
+                'items': json.dumps(items), 'subtotal': subtotal, 'tax': tax, 'total': subtotal + tax,
+                'timestamp': start + timedelta(seconds=rng.randint(0, args.history_days * 86400))
+            })
+            lines.extend({
+                'invoice_id': invoice_id, 'menu_item_id': item['id'], 'product_code': item['product_code'],
+                'name': item['name'], 'quantity': item['quantity'], 'unit_price': item['price'],
+                'category': item['category'], 'department': item['department']
+            } for item in items)
+        if invoices:
+            db.session.execute(insert(Invoice), invoices)
+            db.session.execute(insert(InvoiceLine), lines)
+        db.session.query(BillCounter).filter_by(name='bill').update({'value': len(invoices)})
+        db.session.commit()
+        rebuild_sales_rollup()
+
+        tables = [table.to_dict() for table in Table.query.order_by(Table.name)]
+        menu_items = [item.to_dict() for item in MenuItem.query]
+    return tables, menu_items
+
+def boot_app(args):
+    """Point the app at the benchmark database and migrate it"""
+    if not args.database_url:
+        args.database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='pos-bench-'), 'bench.db')
+    os.environ['DATABASE_URL'] = args.database_url
+
+    from init_db import upgrade_database
+    from app import app, db
+    upgrade_database()
+    return app, db
+
+def start_server(app):
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+class Recorder:
+    """Latencies and failures per endpoint, shared by all terminals"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def add(self, endpoint, seconds, ok):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            if not ok:
+                self.errors[endpoint] += 1
+
+class Terminal:
+    """One simulated POS terminal working through its share of the tables"""
+
+    def __init__(self, base_url, recorder, tables, menu_items, rng):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.tables = tables
+        self.menu_items = menu_items
+        self.rng = rng
+
+    def call(self, endpoint, method, path, body=None, idempotent=False):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        request.add_header('Content-Type', 'application/json')
+        if idempotent:
+            # Same as the frontend, which sends a key with order and invoice writes
+            request.add_header('Idempotency-Key', str(uuid.uuid4()))
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                payload = response.read()
+                ok = response.status < 400
+        except urllib.error.HTTPError as error:
+            payload, ok = error.read(), False
+        except OSError:
+            payload, ok = b'', False
+        self.recorder.add(endpoint, time.perf_counter() - started, ok)
+        try:
+            return json.loads(payload) if payload else None
+        except ValueError:
+            return None
+
+    def pick_items(self, low, high):
+        picked = self.rng.sample(self.menu_items, self.rng.randint(low, high))
+        return [
+            {
+                'id': item['id'], 'name': item['name'], 'price': item['price'],
+                'category': item['category'], 'department': item['department'],
+                'quantity': self.rng.randint(1, 3), 'sentToKitchen': False
+            }
+            for item in picked
+        ]
+
+    def seat(self, table):
+        # The same requests DineInPage makes: each round of items is one KOT
+        # request, and the bill is one checkout plus the printed copy
+        path = f"/api/orders/table/{table['id']}"
+        self.call('GET /api/floor', 'GET', '/api/floor')
+        self.call('POST /api/orders/table/<id>/kot', 'POST', f'{path}/kot',
+                  {'table_name': table['name'], 'items': self.pick_items(2, 5)}, idempotent=True)
+        # Second round, e.g. desserts and drinks
+        self.call('POST /api/orders/table/<id>/kot', 'POST', f'{path}/kot',
+                  {'table_name': table['name'], 'items': self.pick_items(1, 3)}, idempotent=True)
+
+        invoice = self.call('POST /api/orders/table/<id>/checkout', 'POST', f'{path}/checkout', {},
+                            idempotent=True)
+        if invoice and invoice.get('id'):
+            self.call('GET /api/invoices/<id>/print', 'GET', f"/api/invoices/{invoice['id']}/print")
+
+    def refresh_dashboard(self):
+        """The requests DashboardPage makes on load, with the same parameters"""
+        # The browser works in local time and sends UTC ISO timestamps
+        now = datetime.now().astimezone()
+        tz_offset = int(now.utcoffset().total_seconds() // 60)
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        yesterday_start = today_start - timedelta(days=1)
+
+        def iso(moment):
+            return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+        def query(**params):
+            return urllib.parse.urlencode({'orderType': 'all', 'tzOffset': tz_offset, **params})
+
+        self.call('GET /api/reports/summary', 'GET', f'/api/reports/summary?{query(**{"from": iso(today_start)})}')
+        self.call('GET /api/reports/summary', 'GET',
+                  f'/api/reports/summary?{query(**{"from": iso(yesterday_start), "to": iso(today_start)})}')
+        self.call('GET /api/analytics/top-items', 'GET',
+                  f'/api/analytics/top-items?{query(**{"from": iso(today_start), "by": "revenue", "limit": 5})}')
+        self.call('GET /api/tables', 'GET', '/api/tables')
+
+    def run(self, seatings):
+        for seating in range(seatings):
+            self.seat(self.tables[seating % len(self.tables)])
+            if seating % 3 == 2:
+                self.refresh_dashboard()
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+def summarize(recorder, elapsed):
+    results = {}
+    for endpoint, values in sorted(recorder.latencies.items()):
+        values = sorted(values)
+        results[endpoint] = {
+            'requests': len(values),
+            'errors': recorder.errors.get(endpoint, 0),
+            'rps': round(len(values) / elapsed, 2),
+            'mean_ms': round(statistics.fmean(values) * 1000, 2),
+            'p50_ms': round(percentile(values, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(values, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(values, 0.99) * 1000, 2),
+        }
+    return results
+
+def print_report(results, elapsed, baseline=None):
+    header = f"{'endpoint':<40} {'reqs':>6} {'err':>4} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    print('-' * len(header))
+    for endpoint, row in results.items():
+        line = (f"{endpoint:<40} {row['requests']:>6} {row['errors']:>4} {row['rps']:>8.1f} "
+                f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}")
+        previous = (baseline or {}).get(endpoint)
+        if previous and previous['p95_ms']:
+            change = (row['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+            line += f"   p95 {change:+.0f}% vs {previous['p95_ms']:.1f}"
+        print(line)
+    total = sum(row['requests'] for row in results.values())
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)")
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    server = None
+    if args.url and not args.seed_only:
+        from urllib.request import urlopen
+        base_url = args.url.rstrip('/')
+        with urlopen(f'{base_url}/api/tables') as response:
+            tables = json.loads(response.read())
+        with urlopen(f'{base_url}/api/menu-items') as response:
+            menu_items = json.loads(response.read())
+    else:
+        app, db = boot_app(args)
+        print(f"Seeding {args.database_url}")
+        tables, menu_items = seed_database(app, db, args, rng)
+        if args.seed_only:
+            return
+        server, base_url = start_server(app)
+
+    # Each terminal serves its own section of the floor, like waiters do
+    recorder = Recorder()
+    sections = [tables[index::args.terminals] for index in range(args.terminals)]
+    terminals = [
+        Terminal(base_url, recorder, section, menu_items, random.Random(rng.random()))
+        for section in sections if section
+    ]
+    print(f"Running {len(terminals)} terminals x {args.seatings} seatings against {base_url}\n")
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=terminal.run, args=(args.seatings,)) for terminal in terminals]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    results = summarize(recorder, elapsed)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['endpoints']
+    print_report(results, elapsed, baseline)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'terminals': len(terminals), 'seatings': args.seatings, 'seed': args.seed,
+                'elapsed_seconds': round(elapsed, 3), 'endpoints': results
+            }, f, indent=2)
+    if server is not None:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import threading
+import time
+
+class VersionedCache:
+    """Process-local cache of values tagged with a data version.
+
+    Writers call bump() after committing a change, which invalidates every
+    entry at once. An optional ttl (seconds) bounds how long an entry may be
+    served, for deployments where another worker may have changed the data.
+    An optional max_entries bounds memory for caches keyed by query
+    parameters, evicting the oldest entry first.
+    Cached values are shared between requests and must not be mutated.
+    """
+
+    def __init__(self, ttl=None, max_entries=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._version = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self._version
+
+    def bump(self):
+        """Invalidate all entries by moving to a new version"""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            return self._version
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing, stale or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            version, stored_at, value = entry
+            if version != self._version:
+                return None
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value, version=None):
+        """Store a value and return it.
+
+        Pass the version read before building the value so that a value built
+        from data older than a concurrent bump() is not stored.
+        """
+        with self._lock:
+            if version is None or version == self._version:
+                self._entries.pop(key, None)
+                if self.max_entries is not None and len(self._entries) >= self.max_entries:
+                    # Dicts keep insertion order, so the first key is the oldest
+                    del self._entries[next(iter(self._entries))]
+                self._entries[key] = (self._version, time.monotonic(), value)
+        return value
+
+    def get_or_set(self, key, build):
+        """Return the cached value for key, calling build() to fill a miss"""
+        value = self.get(key)
+        if value is None:
+            version = self._version
+            value = self.set(key, build(), version=version)
+        return value
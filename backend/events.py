@@ -0,0 +1,124 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+HEARTBEAT_SECONDS = 15
+SUBSCRIBER_QUEUE_SIZE = 256
+REPLAY_BUFFER_SIZE = 256
+# Streams end after this long and the browser reconnects with Last-Event-ID,
+# so no request runs forever
+STREAM_SECONDS = int(os.environ.get('EVENTS_STREAM_SECONDS', 300))
+
+class Subscription:
+    """One connected client's queue of pending events"""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.closed = False
+
+class EventBroker:
+    """In-process publish/subscribe hub behind the /api/events SSE stream.
+
+    Each subscriber gets a bounded queue; a subscriber that falls too far
+    behind is closed and must reconnect, at which point recent events are
+    replayed from Last-Event-ID. Events only reach clients connected to the
+    same process, so with several workers they are hints: the client also
+    refetches tables and orders every 30 seconds to pick up changes made
+    through other workers.
+
+    Every open stream holds a worker thread, so max_streams caps how many a
+    process serves at once, leaving the rest of its threads for API calls.
+    """
+
+    def __init__(self, max_streams=None):
+        self.max_streams = max_streams
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._recent = deque(maxlen=REPLAY_BUFFER_SIZE)
+        self._next_id = 1
+        self._closed = False
+
+    def publish(self, event_type, data):
+        """Send an event to every subscriber"""
+        with self._lock:
+            event = (self._next_id, event_type, json.dumps(data))
+            self._next_id += 1
+            self._recent.append(event)
+            for subscription in list(self._subscriptions):
+                try:
+                    subscription.queue.put_nowait(event)
+                except queue.Full:
+                    # Too slow to keep up; close it so the client reconnects
+                    subscription.closed = True
+                    self._subscriptions.discard(subscription)
+
+    def subscribe(self, last_event_id=None):
+        """Register a subscription, pre-filled with events after last_event_id.
+
+        Returns None if the broker is closed or already serving max_streams.
+        """
+        subscription = Subscription()
+        with self._lock:
+            if self._closed:
+                return None
+            if self.max_streams is not None and len(self._subscriptions) >= self.max_streams:
+                return None
+            if last_event_id is not None:
+                for event in self._recent:
+                    if event[0] > last_event_id and not subscription.queue.full():
+                        subscription.queue.put_nowait(event)
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def close(self):
+        """End every open stream and refuse new ones, e.g. when the worker shuts down"""
+        with self._lock:
+            self._closed = True
+            for subscription in self._subscriptions:
+                subscription.closed = True
+                try:
+                    # Wake the stream now rather than at its next heartbeat
+                    subscription.queue.put_nowait(None)
+                except queue.Full:
+                    pass
+            self._subscriptions.clear()
+
+    def stream(self, subscription, stream_seconds=STREAM_SECONDS):
+        """Generate Server-Sent Events text for a subscription until it ends"""
+        deadline = time.monotonic() + stream_seconds
+        try:
+            # Tell the browser how long to wait before reconnecting
+            yield 'retry: 3000\n\n'
+            while not subscription.closed or not subscription.queue.empty():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    event = subscription.queue.get(timeout=min(HEARTBEAT_SECONDS, remaining))
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ': heartbeat\n\n'
+                    continue
+                if event is None:
+                    break
+                event_id, event_type, payload = event
+                yield f'id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n'
+        finally:
+            self.unsubscribe(subscription)
+
+def default_max_streams():
+    """Half of a gunicorn worker's threads; unlimited under the development server"""
+    if os.environ.get('EVENTS_MAX_STREAMS'):
+        return int(os.environ['EVENTS_MAX_STREAMS'])
+    # gunicorn.conf.py exports GUNICORN_THREADS before the app is imported
+    threads = os.environ.get('GUNICORN_THREADS')
+    return max(1, int(threads) // 2) if threads else None
+
+broker = EventBroker(max_streams=default_max_streams())
@@ -0,0 +1,88 @@
+import tempfile
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.utils import get_column_letter
+from models import db, MenuItem, Category, Department, Invoice, InvoiceLine
+
+EXPORT_BATCH_SIZE = 1000
+
+def header_row(ws, headers, color):
+    """Styled header cells for a write-only worksheet"""
+    cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = Font(bold=True, color="FFFFFF")
+        cell.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+        cell.alignment = Alignment(horizontal="center")
+        cells.append(cell)
+    return cells
+
+def write_sheet(wb, title, headers, color, widths, query):
+    """Append a sheet whose rows are streamed from a column query in batches"""
+    ws = wb.create_sheet(title)
+    # Column widths must be set before any row is written in write-only mode
+    for index, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(index)].width = width
+    ws.append(header_row(ws, headers, color))
+    for row in query.yield_per(EXPORT_BATCH_SIZE):
+        ws.append(list(row))
+
+def save_to_tempfile(wb):
+    """Save a workbook to an anonymous temp file, rewound for sending"""
+    output = tempfile.TemporaryFile()
+    wb.save(output)
+    output.seek(0)
+    return output
+
+def build_menu_export():
+    """Write categories, departments and menu items to a temp .xlsx file"""
+    wb = Workbook(write_only=True)
+    write_sheet(
+        wb, "Categories", ["Category Name"], "4472C4", [30],
+        db.session.query(Category.name).order_by(Category.name)
+    )
+    write_sheet(
+        wb, "Departments", ["Department Name"], "70AD47", [30],
+        db.session.query(Department.name).order_by(Department.name)
+    )
+    write_sheet(
+        wb, "Menu Items",
+        ["Product Code", "Item Name", "Price", "Category", "Department", "Description"],
+        "ED7D31", [20, 30, 15, 20, 20, 50],
+        db.session.query(
+            MenuItem.product_code, MenuItem.name, MenuItem.price,
+            MenuItem.category, MenuItem.department, MenuItem.description
+        ).order_by(MenuItem.product_code)
+    )
+    return save_to_tempfile(wb)
+
+def build_invoice_export(start=None, end=None):
+    """Write invoices and their line items in [start, end) to a temp .xlsx file"""
+    filters = []
+    if start:
+        filters.append(Invoice.timestamp >= start)
+    if end:
+        filters.append(Invoice.timestamp < end)
+
+    wb = Workbook(write_only=True)
+    write_sheet(
+        wb, "Invoices",
+        ["Bill Number", "Date", "Order Type", "Table", "Subtotal", "Tax", "Total"],
+        "4472C4", [20, 22, 15, 15, 15, 15, 15],
+        db.session.query(
+            Invoice.bill_number, Invoice.timestamp, Invoice.order_type, Invoice.table_name,
+            Invoice.subtotal, Invoice.tax, Invoice.total
+        ).filter(*filters).order_by(Invoice.timestamp, Invoice.id)
+    )
+    write_sheet(
+        wb, "Invoice Lines",
+        ["Bill Number", "Date", "Product Code", "Item Name", "Quantity", "Unit Price", "Category", "Department"],
+        "ED7D31", [20, 22, 20, 30, 12, 15, 20, 20],
+        db.session.query(
+            Invoice.bill_number, Invoice.timestamp, InvoiceLine.product_code, InvoiceLine.name,
+            InvoiceLine.quantity, InvoiceLine.unit_price, InvoiceLine.category, InvoiceLine.department
+        ).join(InvoiceLine, InvoiceLine.invoice_id == Invoice.id)
+        .filter(*filters).order_by(Invoice.timestamp, Invoice.id, InvoiceLine.id)
+    )
+    return save_to_tempfile(wb)
@@ -0,0 +1,50 @@
+import os
+
+# Gunicorn settings for production; see wsgi.py for the application entry point
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Threaded workers: each request, including every open /api/events stream,
+# holds a thread until it finishes. At most half of each worker's threads
+# serve event streams (EVENTS_MAX_STREAMS); further streams get a 503 and
+# those terminals retry later, so API calls always have threads left.
+# WEB_CONCURRENCY is set by Render from the instance size
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+# The app sizes its per-process caches and stream slots from these
+os.environ['WEB_CONCURRENCY'] = str(workers)
+os.environ['GUNICORN_THREADS'] = str(threads)
+
+# Import the app once in the master and fork workers from it
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+# On SIGTERM, give in-flight requests this long to finish before workers are killed
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+
+def post_fork(server, worker):
+    """Drop pooled connections inherited from the master without closing them"""
+    from app import app, db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+def post_worker_init(worker):
+    """End event streams as soon as the worker is told to stop.
+
+    Streams otherwise run until EVENTS_STREAM_SECONDS, so every graceful
+    shutdown would wait out graceful_timeout and then kill the worker.
+    """
+    import signal
+    from events import broker
+
+    handle_exit = worker.handle_exit
+
+    def close_streams_and_exit(sig, frame):
+        broker.close()
+        handle_exit(sig, frame)
+
+    signal.signal(signal.SIGTERM, close_streams_and_exit)
@@ -0,0 +1,139 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import request, jsonify, make_response
+from sqlalchemy.exc import IntegrityError
+from models import db, IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+# How long a key and its stored response are kept for replay
+IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL', 24 * 60 * 60))
+PURGE_INTERVAL_SECONDS = 300
+MAX_KEY_LENGTH = 255
+
+_purge_lock = threading.Lock()
+_last_purge = 0.0
+
+def request_fingerprint():
+    """Hash of the method, path and body, so a key cannot be reused for a different request"""
+    digest = hashlib.sha256()
+    digest.update(request.method.encode('utf-8'))
+    digest.update(request.path.encode('utf-8'))
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+def purge_expired_keys(cutoff):
+    """Delete expired keys, at most once every PURGE_INTERVAL_SECONDS per process"""
+    global _last_purge
+    with _purge_lock:
+        now = time.monotonic()
+        if now - _last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        _last_purge = now
+    IdempotencyKey.query.filter(IdempotencyKey.created_at < cutoff).delete(synchronize_session=False)
+
+def replay_response(record):
+    response = make_response(record.response_body, record.status_code)
+    response.mimetype = 'application/json'
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+def reserve_key(key, fingerprint):
+    """Claim key for this request.
+
+    The reservation is flushed but not committed, so it commits or rolls
+    back together with the view's write; a concurrent request with the same
+    key waits on the row until then. Returns None when the caller should run
+    the write, otherwise the response to send instead: the stored response
+    for a completed request, 409 while the first request is still storing
+    its response, or 422 when the key was used for a different request.
+    """
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=IDEMPOTENCY_TTL)
+    try:
+        purge_expired_keys(cutoff)
+        record = db.session.get(IdempotencyKey, key)
+        if record is not None and record.created_at < cutoff:
+            db.session.delete(record)
+            db.session.flush()
+            record = None
+        if record is None:
+            db.session.add(IdempotencyKey(key=key, request_hash=fingerprint, created_at=now))
+            db.session.flush()
+            return None
+    except IntegrityError:
+        # Another worker claimed the key and committed between our read and insert
+        db.session.rollback()
+        record = db.session.get(IdempotencyKey, key)
+        if record is None:
+            return jsonify({'error': 'Request with this Idempotency-Key is in progress'}), 409
+
+    if record.request_hash != fingerprint:
+        return jsonify({'error': 'Idempotency-Key was already used for a different request'}), 422
+    if record.status_code is None:
+        return jsonify({'error': 'Request with this Idempotency-Key is in progress'}), 409
+    return replay_response(record)
+
+def release_key(key):
+    """Drop a reservation whose write failed so a retry runs it again"""
+    try:
+        # Usually the view's rollback already took the reservation with it
+        db.session.rollback()
+        IdempotencyKey.query.filter_by(key=key, status_code=None).delete(synchronize_session=False)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error releasing idempotency key: {e}")
+
+def idempotent(view):
+    """Make a POST view safe to retry with an Idempotency-Key header.
+
+    The first request with a key reserves it in the same transaction as the
+    view's write, runs the view and stores the response; retries with the
+    same key and body get the stored response without running the view
+    again, from any worker. A write that rolls back, or a worker killed
+    before its commit, takes the reservation with it, so a retry runs the
+    write again. Server errors are not stored for the same reason. Requests
+    without the header behave as before.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'Idempotency-Key must be at most {MAX_KEY_LENGTH} characters'}), 400
+
+        early_response = reserve_key(key, request_fingerprint())
+        if early_response is not None:
+            return early_response
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            release_key(key)
+            raise
+        if response.status_code >= 500:
+            release_key(key)
+            return response
+
+        try:
+            record = db.session.get(IdempotencyKey, key)
+            if record is None:
+                # The view rolled back, e.g. before answering 4xx
+                record = IdempotencyKey(key=key, request_hash=request_fingerprint(), created_at=datetime.utcnow())
+                db.session.add(record)
+            record.status_code = response.status_code
+            record.response_body = response.get_data(as_text=True)
+            db.session.commit()
+        except Exception as e:
+            # The write itself succeeded; retries see 409 until the key expires
+            db.session.rollback()
+            logger.error(f"Error storing idempotent response: {e}")
+        return response
+    return wrapper
@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from models import db, BillCounter
+
+# Crockford base32, as used by ULIDs
+ENCODING = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+
+def _reset_after_fork():
+    # Forked workers must not continue the parent's random sequence
+    global _last_ms
+    _last_ms = 0
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def new_id():
+    """Return a new 26-character ULID: a millisecond timestamp then 80 random bits.
+
+    IDs sort by creation time. Within one millisecond the random part is
+    incremented, so IDs from one process are strictly increasing, and IDs
+    from different processes collide only if 80 random bits do.
+    """
+    global _last_ms, _last_random
+    with _lock:
+        ms = int(time.time() * 1000)
+        if ms <= _last_ms:
+            # Same millisecond, or the clock stepped back: stay monotonic
+            ms = _last_ms
+            _last_random += 1
+        else:
+            _last_random = int.from_bytes(os.urandom(10), 'big')
+        _last_ms = ms
+        value = (ms << 80) | _last_random
+
+    chars = []
+    for _ in range(26):
+        chars.append(ENCODING[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+def allocate_number(counter):
+    """Allocate the next value of a named counter inside the caller's transaction.
+
+    The counter row is incremented with a single UPDATE, which holds its row
+    lock until the caller commits. Concurrent callers therefore get
+    consecutive numbers, and a rolled-back transaction gives its number back
+    instead of leaving a gap.
+    """
+    increment = update(BillCounter).where(BillCounter.name == counter).values(value=BillCounter.value + 1)
+    if db.session.execute(increment).rowcount == 0:
+        # The migration seeds the bill counter; create any other on first use
+        try:
+            with db.session.begin_nested():
+                db.session.add(BillCounter(name=counter, value=0))
+        except IntegrityError:
+            pass
+        db.session.execute(increment)
+
+    return db.session.execute(
+        select(BillCounter.value).where(BillCounter.name == counter)
+    ).scalar_one()
+
+def allocate_bill_number(counter='bill'):
+    """Allocate the next sequential bill number, e.g. BILL-000042"""
+    return f"BILL-{allocate_number(counter):06d}"
+
+def allocate_kot_number():
+    """Allocate the next sequential kitchen order ticket number, e.g. KOT-000042"""
+    return f"KOT-{allocate_number('kot'):06d}"
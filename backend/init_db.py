@@ -1,6 +1,9 @@
 import os
 import sys
-from app import app, db
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from flask_migrate import stamp, upgrade
+from app import app, db, migrate, connect_db
 from models import Table, KOTConfig, BillConfig, MenuItem, Category, Department, RestaurantSettings
 from sqlalchemy import inspect, text
 
@@ -56,14 +59,47 @@ def add_missing_columns():
                 except Exception as e:
                     print(f"Error adding format_type column to bill_config: {e}")
 
+# Revision matching the schema that create_all() and add_missing_columns()
+# produced before migrations were introduced
+BASELINE_REVISION = '76aeadeb02c1'
+
+def upgrade_database():
+    """Bring the schema up to the latest migration.
+
+    An up-to-date database costs a single read of alembic_version. Databases
+    created before migrations existed are patched to the baseline schema and
+    stamped, then upgraded like any other. Returns True if the database was
+    empty, so the caller knows to add sample data.
+    """
+    with app.app_context():
+        config = migrate.get_config()
+        head = ScriptDirectory.from_config(config).get_current_head()
+        with db.engine.connect() as conn:
+            current = MigrationContext.configure(conn).get_current_revision()
+        if current == head:
+            print("Database schema is up to date")
+            return False
+        
+        fresh = False
+        if current is None:
+            if 'invoices' in inspect(db.engine).get_table_names():
+                # Legacy database: bring it to the baseline, then record that
+                add_missing_columns()
+                stamp(revision=BASELINE_REVISION)
+                print("Stamped existing database at the baseline revision")
+            else:
+                fresh = True
+        
+        upgrade()
+        print(f"Upgraded database schema to {head}")
+        return fresh
+
 def init_database():
     """Initialize the database with sample data"""
     with app.app_context():
-        # Create all tables
-        db.create_all()
-        
-        # Add missing columns to existing tables
-        add_missing_columns()
+        # Apply pending schema migrations
+        if not upgrade_database():
+            return
         
         # Check if we already have data
         if Table.query.first() is None:
@@ -168,6 +204,9 @@ def init_database():
             raise
 
 if __name__ == "__main__":
+    # Wait for the database to accept connections before initializing it
+    connect_db()
+    
     # Ensure the Flask app is properly configured before initializing the database
     with app.app_context():
         init_database()
\ No newline at end of file
@@ -0,0 +1,178 @@
+from models import db, MenuItem
+from ids import new_id
+from menu_search import mark_menu_changed
+
+MAX_BATCH_OPERATIONS = 1000
+REQUIRED_FIELDS = ('name', 'productCode', 'price', 'category', 'department')
+# JSON field -> MenuItem attribute for the fields an update may change
+ITEM_FIELDS = {
+    'name': 'name',
+    'productCode': 'product_code',
+    'price': 'price',
+    'category': 'category',
+    'department': 'department',
+    'description': 'description'
+}
+
+def validate_fields(fields, required):
+    """Return an error message for bad item fields, or None"""
+    if not isinstance(fields, dict):
+        return "'item' must be an object"
+    # Creates need every required field; updates may omit them but not blank them
+    missing = [
+        name for name in REQUIRED_FIELDS
+        if (required or name in fields) and fields.get(name) in (None, '')
+    ]
+    if missing:
+        return f"Missing {', '.join(missing)}"
+    if 'price' in fields:
+        price = fields['price']
+        if isinstance(price, bool) or not isinstance(price, (int, float)) or price < 0:
+            return 'Price must be a non-negative number'
+    if 'productCode' in fields and not str(fields['productCode'] or '').strip():
+        return 'Product code is required'
+    return None
+
+def load_batch_state(operations):
+    """Load every item, product code and client-chosen id the batch touches in two queries"""
+    # Malformed operations are reported individually by apply_menu_batch
+    operations = [op for op in operations if isinstance(op, dict)]
+    ids = {op.get('id') for op in operations if op.get('op') in ('update', 'delete') and op.get('id')}
+    codes = {
+        str(op['item']['productCode']).strip() for op in operations
+        if isinstance(op.get('item'), dict) and op['item'].get('productCode')
+    }
+    create_ids = {
+        op['item']['id'] for op in operations
+        if op.get('op') == 'create' and isinstance(op.get('item'), dict) and isinstance(op['item'].get('id'), str)
+    }
+
+    items = {}
+    if ids:
+        items = {item.id: item for item in MenuItem.query.filter(MenuItem.id.in_(ids))}
+    code_owner = {item.product_code: item.id for item in items.values()}
+    taken_ids = set(items)
+    if codes or create_ids:
+        for item_id, code in db.session.query(MenuItem.id, MenuItem.product_code).filter(
+            db.or_(MenuItem.product_code.in_(codes), MenuItem.id.in_(create_ids))
+        ):
+            if code in codes:
+                code_owner[code] = item_id
+            taken_ids.add(item_id)
+    return items, code_owner, taken_ids
+
+def apply_menu_batch(operations, atomic=True):
+    """Apply create/update/delete operations on menu items in one transaction.
+
+    Operations are validated in order against the item and product-code
+    state loaded up front, so a code freed by an earlier delete or update
+    in the batch can be reused by a later one; the same goes for ids
+    chosen by the client for creates. Returns (applied, results) with one
+    result per operation. With atomic set, any invalid operation means
+    nothing is written; otherwise the valid ones are committed, and applied
+    says whether there were any.
+    """
+    items, code_owner, taken_ids = load_batch_state(operations)
+    deleted = set()
+    results = []
+    creates, updates, deletes = [], [], []
+
+    for index, op in enumerate(operations):
+        kind = op.get('op') if isinstance(op, dict) else None
+        result = {'index': index, 'op': kind}
+        results.append(result)
+
+        if kind == 'create':
+            fields = op.get('item')
+            error = validate_fields(fields, required=True)
+            if error is None:
+                code = str(fields['productCode']).strip()
+                item_id = fields.get('id') or new_id()
+                if code in code_owner:
+                    error = f"Product code '{code}' already exists"
+                elif not isinstance(item_id, str):
+                    error = "'id' must be a string"
+                elif item_id in taken_ids:
+                    error = f"Menu item '{item_id}' already exists"
+            if error:
+                result.update(status='error', error=error)
+                continue
+            item = MenuItem(
+                id=item_id,
+                name=fields['name'],
+                product_code=code,
+                price=fields['price'],
+                category=fields['category'],
+                department=fields['department'],
+                description=fields.get('description', '')
+            )
+            code_owner[code] = item.id
+            taken_ids.add(item.id)
+            creates.append((result, item))
+            continue
+
+        item_id = op.get('id') if isinstance(op, dict) else None
+        item = items.get(item_id)
+        if kind not in ('update', 'delete'):
+            result.update(status='error', error="'op' must be create, update or delete")
+            continue
+        result['id'] = item_id
+        if item is None or item_id in deleted:
+            result.update(status='error', error='Menu item not found')
+            continue
+
+        if kind == 'delete':
+            deleted.add(item_id)
+            taken_ids.discard(item_id)
+            code_owner.pop(item.product_code, None)
+            deletes.append((result, item))
+            continue
+
+        fields = op.get('item')
+        error = validate_fields(fields, required=False)
+        if error is None and 'productCode' in fields:
+            code = str(fields['productCode']).strip()
+            if code_owner.get(code, item_id) != item_id:
+                error = f"Product code '{code}' already exists"
+        if error:
+            result.update(status='error', error=error)
+            continue
+        changes = {attribute: fields[name] for name, attribute in ITEM_FIELDS.items() if name in fields}
+        if 'product_code' in changes:
+            code_owner.pop(item.product_code, None)
+            changes['product_code'] = str(changes['product_code']).strip()
+            code_owner[changes['product_code']] = item_id
+        updates.append((result, item, changes))
+
+    if atomic and any(result.get('status') == 'error' for result in results):
+        for result in results:
+            result.setdefault('status', 'skipped')
+        return False, results
+    if not (creates or updates or deletes):
+        return False, results
+
+    # Deletes, then updates, then creates, so codes freed earlier in the
+    # batch are free in the database before they are reused. A flush orders
+    # UPDATEs by primary key, so updates that change a product code are
+    # flushed one at a time in batch order; the rest go out together.
+    for _, item in deletes:
+        db.session.delete(item)
+    db.session.flush()
+    for _, item, changes in updates:
+        for attribute, value in changes.items():
+            setattr(item, attribute, value)
+        if 'product_code' in changes:
+            db.session.flush()
+    db.session.flush()
+    db.session.add_all(item for _, item in creates)
+
+    # Serialize before commit expires the objects, which would reload each one
+    for result, _ in deletes:
+        result['status'] = 'deleted'
+    for result, item, _ in updates:
+        result.update(status='updated', item=item.to_dict())
+    for result, item in creates:
+        result.update(status='created', id=item.id, item=item.to_dict())
+    mark_menu_changed()
+    db.session.commit()
+    return True, results
@@ -0,0 +1,140 @@
+import time
+from openpyxl import load_workbook
+from sqlalchemy import insert
+from models import db, MenuItem, Category, Department
+from ids import new_id
+from menu_search import mark_menu_changed
+
+IMPORT_CHUNK_SIZE = 500
+MENU_ITEM_COLUMNS = 6
+
+def is_example_row(value):
+    """Template rows start with 'Example:' and are never imported"""
+    return str(value).startswith('Example:')
+
+def import_names(ws, model, existing_names, stats_key, stats):
+    """Insert the new names from a single-column sheet in one bulk statement"""
+    rows = []
+    for row in ws.iter_rows(min_row=2, max_col=1, values_only=True):
+        if not row or not row[0] or is_example_row(row[0]):
+            continue
+        name = str(row[0]).strip()
+        if name in existing_names:
+            continue
+        existing_names.add(name)
+        rows.append({'id': new_id(), 'name': name})
+
+    if rows:
+        db.session.execute(insert(model), rows)
+    stats[stats_key] += len(rows)
+
+def validate_menu_row(row_idx, row, product_codes, category_names, department_names):
+    """Validate one Menu Items row in memory.
+
+    Returns (values, error); values is None when the row should be skipped.
+    """
+    row = tuple(row) + (None,) * (MENU_ITEM_COLUMNS - len(row))
+    if not row[1] or is_example_row(row[1]):
+        return None, None
+
+    product_code = str(row[0]).strip() if row[0] else ''
+    name = str(row[1]).strip()
+    category = str(row[3]).strip() if row[3] else ''
+    department = str(row[4]).strip() if row[4] else ''
+    description = str(row[5]).strip() if row[5] else ''
+    try:
+        price = float(row[2]) if row[2] else 0
+    except (TypeError, ValueError):
+        return None, f"Row {row_idx}: Invalid price '{row[2]}'"
+
+    if not product_code:
+        return None, f"Row {row_idx}: Product code is required"
+    if product_code in product_codes:
+        return None, f"Row {row_idx}: Product code '{product_code}' already exists"
+    if category and category not in category_names:
+        return None, f"Row {row_idx}: Category '{category}' does not exist"
+    if department and department not in department_names:
+        return None, f"Row {row_idx}: Department '{department}' does not exist"
+
+    return {
+        'name': name,
+        'product_code': product_code,
+        'price': price,
+        'category': category,
+        'department': department,
+        'description': description
+    }, None
+
+def flush_menu_items(chunk, stats):
+    """Insert one chunk of validated items in its own transaction"""
+    try:
+        db.session.execute(insert(MenuItem), [values for _, values in chunk])
+        mark_menu_changed()
+        db.session.commit()
+        stats['items_added'] += len(chunk)
+        stats['chunks_committed'] += 1
+    except Exception as e:
+        db.session.rollback()
+        first_row, last_row = chunk[0][0], chunk[-1][0]
+        stats['errors'].append(f"Rows {first_row}-{last_row}: Failed to save: {str(e)}")
+
+def import_menu_workbook(file, chunk_size=IMPORT_CHUNK_SIZE):
+    """Import categories, departments and menu items from an uploaded workbook.
+
+    Rows are streamed with openpyxl's read-only mode and validated against
+    sets of existing product codes and names loaded once up front, so the
+    import costs a handful of queries plus one bulk insert per chunk no
+    matter how many rows the sheet has.
+    """
+    started = time.monotonic()
+    stats = {
+        'categories_added': 0,
+        'departments_added': 0,
+        'items_added': 0,
+        'rows_processed': 0,
+        'chunks_committed': 0,
+        'errors': []
+    }
+
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        category_names = {name for (name,) in db.session.query(Category.name)}
+        department_names = {name for (name,) in db.session.query(Department.name)}
+        product_codes = {code for (code,) in db.session.query(MenuItem.product_code)}
+
+        # Import Categories and Departments, committed before the items that use them
+        if 'Categories' in wb.sheetnames:
+            import_names(wb['Categories'], Category, category_names, 'categories_added', stats)
+        if 'Departments' in wb.sheetnames:
+            import_names(wb['Departments'], Department, department_names, 'departments_added', stats)
+        db.session.commit()
+
+        # Import Menu Items
+        if 'Menu Items' in wb.sheetnames:
+            chunk = []
+            ws_items = wb['Menu Items']
+            for row_idx, row in enumerate(ws_items.iter_rows(min_row=2, max_col=MENU_ITEM_COLUMNS, values_only=True), start=2):
+                values, error = validate_menu_row(row_idx, row, product_codes, category_names, department_names)
+                if values is None and error is None:
+                    continue
+
+                stats['rows_processed'] += 1
+                if error:
+                    stats['errors'].append(error)
+                    continue
+
+                product_codes.add(values['product_code'])
+                values['id'] = new_id()
+                chunk.append((row_idx, values))
+                if len(chunk) >= chunk_size:
+                    flush_menu_items(chunk, stats)
+                    chunk = []
+            if chunk:
+                flush_menu_items(chunk, stats)
+    finally:
+        wb.close()
+
+    elapsed = time.monotonic() - started
+    stats['duration_seconds'] = round(elapsed, 3)
+    stats['rows_per_second'] = round(stats['rows_processed'] / elapsed, 1) if elapsed > 0 else None
+    return stats
@@ -0,0 +1,149 @@
+import heapq
+import re
+import threading
+from collections import defaultdict
+from sqlalchemy import func, select
+from models import db, MenuItem, BillCounter
+from ids import allocate_number
+
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Longer query terms are looked up by this prefix and then checked in full
+MAX_PREFIX_LENGTH = 12
+
+TOKEN = re.compile(r'\w+')
+# Counter bumped by every menu item write, shared by all workers
+MENU_VERSION_COUNTER = 'menu'
+
+def normalize(value):
+    return (value or '').strip().lower()
+
+def tokens(value):
+    return TOKEN.findall(normalize(value))
+
+def mark_menu_changed():
+    """Bump the menu version inside the caller's transaction"""
+    allocate_number(MENU_VERSION_COUNTER)
+
+def menu_version():
+    """The menu's version counter plus its row count and newest id.
+
+    One cheap query, so every search can check it; the count and id also
+    catch rows added or removed without going through mark_menu_changed().
+    """
+    counter = select(BillCounter.value).where(BillCounter.name == MENU_VERSION_COUNTER).scalar_subquery()
+    return tuple(db.session.execute(select(counter, func.count(MenuItem.id), func.max(MenuItem.id))).one())
+
+class MenuIndex:
+    """Prefix index over menu item names and product codes.
+
+    Built from the menu item dicts once per menu_version(). Every word of the name and the whole product code are
+    indexed by each of their prefixes, so a lookup is one dict access per
+    query term plus a set intersection, independent of menu size.
+    """
+
+    def __init__(self, items):
+        self.items = {item['id']: item for item in items}
+        self.by_code = {}
+        self.by_prefix = defaultdict(set)
+        self.by_category = defaultdict(set)
+        self.by_department = defaultdict(set)
+
+        for item in items:
+            item_id = item['id']
+            code = normalize(item.get('productCode'))
+            if code:
+                self.by_code[code] = item
+            self.by_category[normalize(item.get('category'))].add(item_id)
+            self.by_department[normalize(item.get('department'))].add(item_id)
+            for term in set(tokens(item.get('name')) + ([code] if code else []) + tokens(code)):
+                for length in range(1, min(len(term), MAX_PREFIX_LENGTH) + 1):
+                    self.by_prefix[term[:length]].add(item_id)
+
+        # Frozen so results can be shared between requests
+        self.by_prefix = dict(self.by_prefix)
+        self.by_category = dict(self.by_category)
+        self.by_department = dict(self.by_department)
+
+    def lookup_code(self, code):
+        """The item with exactly this product code (case-insensitive), or None"""
+        return self.by_code.get(normalize(code))
+
+    def matches_term(self, term):
+        ids = self.by_prefix.get(term[:MAX_PREFIX_LENGTH], set())
+        if len(term) <= MAX_PREFIX_LENGTH:
+            return ids
+        return {
+            item_id for item_id in ids
+            if any(token.startswith(term) for token in self.item_terms(self.items[item_id]))
+        }
+
+    @staticmethod
+    def item_terms(item):
+        code = normalize(item.get('productCode'))
+        return tokens(item.get('name')) + ([code] if code else [])
+
+    def search(self, query='', category=None, department=None, limit=SEARCH_LIMIT):
+        """Items whose name words or product code start with every query term.
+
+        An exact product code match comes first, then code prefixes, then
+        items whose name starts with the query, then the rest by name.
+        """
+        terms = tokens(query)
+        query = normalize(query)
+
+        candidates = None
+        for term in terms:
+            ids = self.matches_term(term)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        if category:
+            ids = self.by_category.get(normalize(category), set())
+            candidates = ids if candidates is None else candidates & ids
+        if department:
+            ids = self.by_department.get(normalize(department), set())
+            candidates = ids if candidates is None else candidates & ids
+        if candidates is None:
+            candidates = self.items.keys()
+
+        def rank(item_id):
+            item = self.items[item_id]
+            code = normalize(item.get('productCode'))
+            name = normalize(item.get('name'))
+            if not query:
+                tier = 0
+            elif code == query:
+                tier = 0
+            elif code.startswith(query):
+                tier = 1
+            elif name.startswith(query):
+                tier = 2
+            else:
+                tier = 3
+            return tier, name, item_id
+
+        return [self.items[item_id] for item_id in heapq.nsmallest(limit, candidates, key=rank)]
+
+class MenuIndexCache:
+    """The current MenuIndex of this process, rebuilt only when menu_version() changes.
+
+    Unlike the catalog cache it has no TTL: the version check sees changes
+    made through any worker, so the index is never rebuilt just because time
+    passed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._index = None
+
+    def get(self, load_items):
+        version = menu_version()
+        with self._lock:
+            if version == self._version:
+                return self._index
+        index = MenuIndex(load_items())
+        with self._lock:
+            self._version, self._index = version, index
+        return index
@@ -0,0 +1,208 @@
+import os
+import threading
+import time
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+def format_labels(names, values):
+    # Each worker process keeps its own numbers; the pid keeps their series
+    # apart. Read at render time since gunicorn forks after importing the app.
+    pairs = [('worker', os.getpid())] + list(zip(names, values))
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonic counter keyed by label values"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield self.name, format_labels(self.labelnames, labels), value
+
+class Histogram:
+    """Cumulative bucket histogram keyed by label values"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # One count per bucket plus +Inf, then the running sum
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            counts = series[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            series[1] += value
+
+    def samples(self):
+        with self._lock:
+            snapshot = {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+        for labels, (counts, total) in sorted(snapshot.items()):
+            names = self.labelnames + ('le',)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                le = bound if bound == '+Inf' else format_value(float(bound))
+                yield f'{self.name}_bucket', format_labels(names, labels + (le,)), cumulative
+            yield f'{self.name}_sum', format_labels(self.labelnames, labels), total
+            yield f'{self.name}_count', format_labels(self.labelnames, labels), cumulative
+
+REQUEST_LATENCY = Histogram(
+    'pos_http_request_duration_seconds', 'Time spent handling a request',
+    ('method', 'route')
+)
+REQUESTS = Counter(
+    'pos_http_requests_total', 'Requests handled, by response status',
+    ('method', 'route', 'status')
+)
+REQUEST_SQL_STATEMENTS = Histogram(
+    'pos_http_request_sql_statements', 'SQL statements executed per request',
+    ('method', 'route'), buckets=SQL_COUNT_BUCKETS
+)
+REQUEST_SQL_SECONDS = Histogram(
+    'pos_http_request_sql_seconds', 'Time spent in SQL statements per request',
+    ('method', 'route')
+)
+SQL_STATEMENTS = Counter(
+    'pos_sql_statements_total', 'SQL statements executed, inside or outside requests'
+)
+SQL_ERRORS = Counter(
+    'pos_sql_statement_errors_total', 'SQL statements that raised, inside or outside requests'
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    'pos_db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection',
+    buckets=POOL_WAIT_BUCKETS
+)
+
+REGISTRY = (
+    REQUEST_LATENCY, REQUESTS, REQUEST_SQL_STATEMENTS, REQUEST_SQL_SECONDS,
+    SQL_STATEMENTS, SQL_ERRORS, POOL_CHECKOUT_WAIT
+)
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record_statement(time.perf_counter() - conn.info['metrics_query_start'].pop())
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context):
+    # after_cursor_execute is skipped when a statement raises; pop its start
+    # here so the connection's stack stays balanced for its next statement
+    conn = exception_context.connection
+    starts = conn.info.get('metrics_query_start') if conn is not None else None
+    if exception_context.statement is None or not starts:
+        return
+    record_statement(time.perf_counter() - starts.pop())
+    SQL_ERRORS.inc()
+
+def record_statement(elapsed):
+    SQL_STATEMENTS.inc()
+    if has_request_context() and 'metrics_started' in g:
+        g.metrics_sql_count += 1
+        g.metrics_sql_seconds += elapsed
+
+def route_label():
+    # The URL rule, not the path, so ids do not create a series per table
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+def record_request(status):
+    if g.get('metrics_recorded'):
+        return
+    g.metrics_recorded = True
+    labels = (request.method, route_label())
+    REQUEST_LATENCY.observe(time.perf_counter() - g.metrics_started, labels)
+    REQUESTS.inc(labels + (str(status),))
+    REQUEST_SQL_STATEMENTS.observe(g.metrics_sql_count, labels)
+    REQUEST_SQL_SECONDS.observe(g.metrics_sql_seconds, labels)
+
+def init_metrics(app):
+    """Time every request of app and count the SQL it runs"""
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        g.metrics_sql_count = 0
+        g.metrics_sql_seconds = 0.0
+
+    @app.after_request
+    def finish_request_metrics(response):
+        if 'metrics_started' in g:
+            record_request(response.status_code)
+        return response
+
+    @app.teardown_request
+    def finish_failed_request_metrics(error):
+        # after_request is skipped when a view raises
+        if error is not None and 'metrics_started' in g and 'metrics_recorded' not in g:
+            record_request(500)
+
+def render_metrics(pool=None):
+    """Current metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.help_text}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for name, labels, value in metric.samples():
+            lines.append(f'{name}{labels} {format_value(value)}')
+
+    if isinstance(pool, QueuePool):
+        for name, help_text, value in (
+            ('pos_db_pool_size', 'Configured connections in the pool', pool.size()),
+            ('pos_db_pool_checked_out', 'Connections currently checked out', pool.checkedout()),
+            ('pos_db_pool_overflow', 'Connections open beyond the pool size', max(pool.overflow(), 0)),
+        ):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name}{format_labels((), ())} {value}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,73 @@
+"""add sales_rollup and backfill it from invoices
+
+Revision ID: 2070fcd83359
+Revises: 8e74f9953207
+Create Date: 2026-10-16 23:58:38.740410
+
+"""
+import os
+from collections import defaultdict
+from datetime import timedelta, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2070fcd83359'
+down_revision = '8e74f9953207'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+invoices = sa.table('invoices',
+    sa.column('timestamp', sa.DateTime),
+    sa.column('order_type', sa.String),
+    sa.column('subtotal', sa.Float),
+    sa.column('tax', sa.Float),
+    sa.column('total', sa.Float)
+)
+
+
+def upgrade():
+    sales_rollup = op.create_table('sales_rollup',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('hour', sa.Integer(), nullable=False),
+    sa.Column('order_type', sa.String(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('subtotal', sa.Float(), nullable=False),
+    sa.Column('tax', sa.Float(), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'hour', 'order_type')
+    )
+
+    # Same bucketing as sales_rollup.local_bucket()
+    offset = timedelta(minutes=int(os.environ.get('BUSINESS_UTC_OFFSET', 0)))
+    buckets = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+    result = op.get_bind().execution_options(yield_per=BACKFILL_BATCH_SIZE).execute(
+        sa.select(invoices.c.timestamp, invoices.c.order_type, invoices.c.subtotal, invoices.c.tax, invoices.c.total)
+    )
+    for timestamp, order_type, subtotal, tax, total in result:
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        local = timestamp + offset
+        bucket = buckets[(local.date(), local.hour, order_type)]
+        bucket[0] += 1
+        bucket[1] += subtotal
+        bucket[2] += tax
+        bucket[3] += total
+
+    rows = [
+        {
+            'day': day, 'hour': hour, 'order_type': order_type,
+            'orders': orders, 'subtotal': subtotal, 'tax': tax, 'total': total
+        }
+        for (day, hour, order_type), (orders, subtotal, tax, total) in buckets.items()
+    ]
+    if rows:
+        op.bulk_insert(sales_rollup, rows)
+
+
+def downgrade():
+    op.drop_table('sales_rollup')
@@ -0,0 +1,27 @@
+"""index invoices.timestamp
+
+Revision ID: 64110eafce47
+Revises: 76aeadeb02c1
+Create Date: 2026-10-16 12:01:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '64110eafce47'
+down_revision = '76aeadeb02c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases set up by the old init_db.py may already have this index
+    indexes = [index['name'] for index in sa.inspect(op.get_bind()).get_indexes('invoices')]
+    if 'ix_invoices_timestamp' not in indexes:
+        op.create_index('ix_invoices_timestamp', 'invoices', ['timestamp'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_invoices_timestamp', table_name='invoices')
@@ -0,0 +1,111 @@
+"""baseline schema
+
+Revision ID: 76aeadeb02c1
+Revises: 
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '76aeadeb02c1'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tables',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('seats', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('table_orders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('table_id', sa.String(), nullable=False),
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('items', sa.Text(), nullable=True),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['table_id'], ['tables.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('invoices',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('bill_number', sa.String(), nullable=False),
+    sa.Column('order_type', sa.String(), nullable=False),
+    sa.Column('table_name', sa.String(), nullable=True),
+    sa.Column('items', sa.Text(), nullable=False),
+    sa.Column('subtotal', sa.Float(), nullable=False),
+    sa.Column('tax', sa.Float(), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('kot_config',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('print_by_department', sa.Boolean(), nullable=False),
+    sa.Column('number_of_copies', sa.Integer(), nullable=False),
+    sa.Column('selected_printer', sa.String(), nullable=True),
+    sa.Column('paper_size', sa.String(), nullable=True),
+    sa.Column('format_type', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('bill_config',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('auto_print_dine_in', sa.Boolean(), nullable=False),
+    sa.Column('auto_print_takeaway', sa.Boolean(), nullable=False),
+    sa.Column('selected_printer', sa.String(), nullable=True),
+    sa.Column('paper_size', sa.String(), nullable=True),
+    sa.Column('format_type', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('menu_items',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('product_code', sa.String(), nullable=False),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('department', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('product_code')
+    )
+    op.create_table('categories',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('departments',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('restaurant_settings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_name', sa.String(), nullable=False),
+    sa.Column('address', sa.String(), nullable=True),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('currency', sa.String(), nullable=False),
+    sa.Column('tax_rate', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('restaurant_settings')
+    op.drop_table('departments')
+    op.drop_table('categories')
+    op.drop_table('menu_items')
+    op.drop_table('bill_config')
+    op.drop_table('kot_config')
+    op.drop_table('invoices')
+    op.drop_table('table_orders')
+    op.drop_table('tables')
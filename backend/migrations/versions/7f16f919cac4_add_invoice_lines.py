@@ -0,0 +1,108 @@
+"""add invoice_lines and backfill from invoices.items
+
+Revision ID: 7f16f919cac4
+Revises: 64110eafce47
+Create Date: 2026-10-16 12:02:00.000000
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f16f919cac4'
+down_revision = '64110eafce47'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 500
+
+invoices = sa.table('invoices',
+    sa.column('id', sa.String),
+    sa.column('items', sa.Text)
+)
+invoice_lines = sa.table('invoice_lines',
+    sa.column('invoice_id', sa.String),
+    sa.column('menu_item_id', sa.String),
+    sa.column('product_code', sa.String),
+    sa.column('name', sa.String),
+    sa.column('quantity', sa.Integer),
+    sa.column('unit_price', sa.Float),
+    sa.column('category', sa.String),
+    sa.column('department', sa.String)
+)
+menu_items = sa.table('menu_items',
+    sa.column('id', sa.String),
+    sa.column('name', sa.String),
+    sa.column('product_code', sa.String),
+    sa.column('category', sa.String),
+    sa.column('department', sa.String)
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    # Databases set up by the old init_db.py may already have this table
+    if 'invoice_lines' not in sa.inspect(bind).get_table_names():
+        op.create_table('invoice_lines',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('invoice_id', sa.String(), nullable=False),
+        sa.Column('menu_item_id', sa.String(), nullable=True),
+        sa.Column('product_code', sa.String(), nullable=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('unit_price', sa.Float(), nullable=False),
+        sa.Column('category', sa.String(), nullable=True),
+        sa.Column('department', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['invoice_id'], ['invoices.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_invoice_lines_invoice_id', 'invoice_lines', ['invoice_id'], unique=False)
+        op.create_index('ix_invoice_lines_menu_item_id', 'invoice_lines', ['menu_item_id'], unique=False)
+        op.create_index('ix_invoice_lines_department', 'invoice_lines', ['department'], unique=False)
+
+    backfill_invoice_lines(bind)
+
+
+def backfill_invoice_lines(bind):
+    """Decode the JSON items of every invoice that has no lines yet"""
+    menu = {row.id: row for row in bind.execute(sa.select(menu_items))}
+    has_lines = sa.select(invoice_lines.c.invoice_id).distinct()
+    last_id = None
+
+    while True:
+        query = sa.select(invoices.c.id, invoices.c['items']).where(
+            ~invoices.c.id.in_(has_lines)
+        ).order_by(invoices.c.id).limit(BACKFILL_BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(invoices.c.id > last_id)
+        rows = bind.execute(query).fetchall()
+        if not rows:
+            break
+
+        lines = []
+        for invoice_id, items_json in rows:
+            for item in json.loads(items_json) if items_json else []:
+                menu_item = menu.get(str(item.get('id')))
+                lines.append({
+                    'invoice_id': invoice_id,
+                    'menu_item_id': str(item['id']) if item.get('id') is not None else None,
+                    'product_code': item.get('productCode') or (menu_item.product_code if menu_item else None),
+                    'name': item.get('name') or (menu_item.name if menu_item else ''),
+                    'quantity': int(item.get('quantity', 1)),
+                    'unit_price': float(item.get('price', 0)),
+                    'category': item.get('category') or (menu_item.category if menu_item else None),
+                    'department': item.get('department') or (menu_item.department if menu_item else None)
+                })
+        if lines:
+            bind.execute(invoice_lines.insert(), lines)
+        last_id = rows[-1].id
+
+
+def downgrade():
+    op.drop_index('ix_invoice_lines_department', table_name='invoice_lines')
+    op.drop_index('ix_invoice_lines_menu_item_id', table_name='invoice_lines')
+    op.drop_index('ix_invoice_lines_invoice_id', table_name='invoice_lines')
+    op.drop_table('invoice_lines')
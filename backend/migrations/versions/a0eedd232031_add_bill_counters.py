@@ -0,0 +1,30 @@
+"""add bill_counters for sequential bill numbers
+
+Revision ID: a0eedd232031
+Revises: 7f16f919cac4
+Create Date: 2026-10-16 12:03:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a0eedd232031'
+down_revision = '7f16f919cac4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bill_counters = op.create_table('bill_counters',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Seed the default counter so the first bills never race to create it
+    op.bulk_insert(bill_counters, [{'name': 'bill', 'value': 0}])
+
+
+def downgrade():
+    op.drop_table('bill_counters')
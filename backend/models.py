@@ -52,7 +52,7 @@ class Invoice(db.Model):
     subtotal = db.Column(db.Float, nullable=False)
     tax = db.Column(db.Float, nullable=False)
     total = db.Column(db.Float, nullable=False)
-    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
     
     def to_dict(self):
         return {
@@ -67,6 +67,59 @@ class Invoice(db.Model):
             'timestamp': self.timestamp.isoformat()
         }
 
+class InvoiceLine(db.Model):
+    __tablename__ = 'invoice_lines'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    invoice_id = db.Column(db.String, db.ForeignKey('invoices.id', ondelete='CASCADE'), nullable=False, index=True)
+    menu_item_id = db.Column(db.String, nullable=True, index=True)
+    product_code = db.Column(db.String, nullable=True)
+    name = db.Column(db.String, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    unit_price = db.Column(db.Float, nullable=False)
+    category = db.Column(db.String, nullable=True)
+    department = db.Column(db.String, nullable=True, index=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'invoiceId': self.invoice_id,
+            'menuItemId': self.menu_item_id,
+            'productCode': self.product_code,
+            'name': self.name,
+            'quantity': self.quantity,
+            'unitPrice': self.unit_price,
+            'category': self.category,
+            'department': self.department
+        }
+
+class SalesRollup(db.Model):
+    __tablename__ = 'sales_rollup'
+    
+    # Business-local day and hour (see sales_rollup.BUSINESS_UTC_OFFSET)
+    day = db.Column(db.Date, primary_key=True)
+    hour = db.Column(db.Integer, primary_key=True)
+    order_type = db.Column(db.String, primary_key=True)
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    subtotal = db.Column(db.Float, nullable=False, default=0)
+    tax = db.Column(db.Float, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0)
+
+class BillCounter(db.Model):
+    __tablename__ = 'bill_counters'
+    
+    name = db.Column(db.String, primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+    
+    key = db.Column(db.String, primary_key=True)
+    request_hash = db.Column(db.String, nullable=False)
+    status_code = db.Column(db.Integer, nullable=True)  # None while the first request is running
+    response_body = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
 class KOTConfig(db.Model):
     __tablename__ = 'kot_config'
     
@@ -0,0 +1,164 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from jinja2 import Environment
+
+# Font size, padding and print width for each thermal paper size
+PAPER_SIZES = {
+    '58mm': {'font_size': '10px', 'padding': '5px'},
+    '80mm': {'font_size': '12px', 'padding': '8px'},
+    '112mm': {'font_size': '14px', 'padding': '12px'}
+}
+DEFAULT_PAPER_SIZE = '80mm'
+KOT_FORMATS = ('detailed', 'compact', 'grouped')
+BILL_FORMATS = ('standard', 'detailed', 'compact')
+CURRENCY_SYMBOLS = {'INR': '₹', 'USD': '$', 'EUR': '€', 'GBP': '£'}
+
+PAGE = """<!doctype html><html><head><meta charset="utf-8"><title>{{ title }}</title><style>
+body { font-family: Arial, Helvetica, sans-serif; font-size: %(font_size)s; padding: %(padding)s; max-width: %(width)s; margin: 0 auto; box-sizing: border-box; }
+.h { text-align: center; font-weight: 700; }
+.c { text-align: center; }
+.r { float: right; }
+hr { border: none; border-top: 1px dashed #000; margin: 5px 0; }
+@media print {
+  @page { size: %(width)s auto; margin: 0; }
+  body { width: %(width)s; max-width: %(width)s; padding: %(padding)s; margin: 0; }
+}
+</style></head><body>%(body)s</body></html>"""
+
+KOT_BODIES = {
+    'compact': """<div class="h">KOT</div>
+{% if department %}<div class="c">[{{ department }}]</div>{% endif %}
+{% if is_additional %}<div class="h" style="margin:5px 0">*** ADDITIONAL ***</div>{% endif %}
+<div>{{ kot_number }}</div><div>{{ time }}</div>
+<div>Table: {{ table_name }}</div>
+<hr/>
+{% for item in items %}<div>{{ item.name }} x {{ item.quantity }}</div>
+{% endfor %}<hr/><div class="c">Generated by POS</div>""",
+    'grouped': """<div class="h">KITCHEN ORDER TICKET</div>
+{% if is_additional %}<div class="h" style="margin:5px 0">*** ADDITIONAL ITEMS ***</div>{% endif %}
+<div>KOT No: {{ kot_number }}</div><div>Date: {{ time }}</div>
+<div>Table: {{ table_name }}</div>
+<hr/>
+{% for group in items|groupby('department') %}<div style="font-weight:700;margin-top:10px">[{{ group.grouper }}]</div>
+{% for item in group.list %}<div><strong>{{ item.name }}</strong> x {{ item.quantity }}</div>
+{% endfor %}{% endfor %}<hr/><div class="c">Generated by Restaurant POS</div>""",
+    'detailed': """<div class="h">KITCHEN ORDER TICKET</div>
+{% if department %}<div class="c">[{{ department }}]</div>{% endif %}
+{% if is_additional %}<div class="h" style="margin:5px 0">*** ADDITIONAL ITEMS ***</div>{% endif %}
+<div>KOT No: {{ kot_number }}</div><div>Date: {{ time }}</div>
+<div>Table: {{ table_name }}</div>
+<hr/>
+{% for item in items %}<div><strong>{{ item.name }}</strong> x {{ item.quantity }} <span class="r">[{{ item.department }}]</span></div>
+{% endfor %}<hr/><div class="c">Generated by Restaurant POS</div>"""
+}
+
+BILL_FOOTER = """<hr/><div class="c" style="margin-top:15px">Thank you for dining with us!</div>
+<div class="c">Please visit again</div>
+<div class="c">Generated by Restaurant POS</div>"""
+
+BILL_BODIES = {
+    'compact': """<div class="h">TAX INVOICE</div>
+<div>Bill: {{ bill_number }}</div><div>{{ time }}</div>
+{% if table_name %}<div>Table: {{ table_name }}</div>{% endif %}
+<hr/>
+{% for item in items %}<div>{{ item.name }} ({{ item.quantity }} x {{ money(item.price) }}) {{ money(item.amount) }}</div>
+{% endfor %}<hr/>
+<div>Subtotal: {{ money(subtotal) }}</div>
+<div>{{ tax_label }}: {{ money(tax) }}</div>
+<div style="font-weight:700">TOTAL: {{ money(total) }}</div>
+""" + BILL_FOOTER,
+    'standard': """<div class="h">{{ restaurant_name|upper }} - TAX INVOICE</div>
+{% if address %}<div class="c">{{ address }}</div>{% endif %}
+{% if phone %}<div class="c">Ph: {{ phone }}</div>{% endif %}
+<div>Bill No: {{ bill_number }}</div><div>Date: {{ time }}</div>
+{% if table_name %}<div>Table: {{ table_name }}</div>{% else %}<div>Takeaway</div>{% endif %}
+<hr/>
+{% for item in items %}<div>{{ item.name }} ({{ item.quantity }} x {{ money(item.price) }}) <span class="r">{{ money(item.amount) }}</span></div>
+{% endfor %}<hr/>
+<div>Subtotal <span class="r">{{ money(subtotal) }}</span></div>
+<div>{{ tax_label }} <span class="r">{{ money(tax) }}</span></div>
+<div style="font-weight:700">TOTAL <span class="r">{{ money(total) }}</span></div>
+""" + BILL_FOOTER
+}
+# The detailed bill has always matched the standard one
+BILL_BODIES['detailed'] = BILL_BODIES['standard']
+
+environment = Environment(autoescape=True, trim_blocks=True)
+
+def print_layout(paper_size, format_type, formats):
+    """Normalize a configured paper size and format, falling back to the defaults"""
+    if paper_size not in PAPER_SIZES:
+        paper_size = DEFAULT_PAPER_SIZE
+    if format_type not in formats:
+        format_type = formats[0]
+    return paper_size, format_type
+
+@lru_cache(maxsize=None)
+def compiled_template(kind, paper_size, format_type):
+    """Compile the template for a normalized (kind, paper size, format) once per process"""
+    bodies = KOT_BODIES if kind == 'kot' else BILL_BODIES
+    source = PAGE % dict(PAPER_SIZES[paper_size], width=paper_size, body=bodies[format_type])
+    return environment.from_string(source)
+
+def local_time(timestamp, tz_offset):
+    """Format a timestamp (ISO string or datetime, naive UTC or aware) at tz_offset minutes east of UTC"""
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp + timedelta(minutes=tz_offset)).strftime('%d/%m/%Y %I:%M %p')
+
+def render_kot(kot, ticket, kot_config, tz_offset=0):
+    """Ready-to-print HTML for one ticket of a KOT, times in the printing terminal's zone"""
+    paper_size, format_type = print_layout(kot_config.get('paperSize'), kot_config.get('formatType'), KOT_FORMATS)
+    items = [
+        {
+            'name': item.get('name', ''),
+            'quantity': item.get('quantity', 1),
+            'department': item.get('department') or ticket.get('department') or 'General'
+        }
+        for item in ticket['items']
+    ]
+    return compiled_template('kot', paper_size, format_type).render(
+        title=kot['kotNumber'],
+        kot_number=kot['kotNumber'],
+        table_name=kot.get('tableName') or 'N/A',
+        department=ticket.get('department'),
+        is_additional=kot.get('isAdditional', False),
+        time=local_time(kot['timestamp'], tz_offset),
+        items=items
+    )
+
+def render_bill(invoice, bill_config, settings, tz_offset=0):
+    """Ready-to-print HTML for an invoice, times in the printing terminal's zone"""
+    paper_size, format_type = print_layout(bill_config.get('paperSize'), bill_config.get('formatType'), BILL_FORMATS)
+    symbol = CURRENCY_SYMBOLS.get(settings.get('currency'), f"{settings.get('currency') or ''} ")
+    items = [
+        {
+            'name': item.get('name', ''),
+            'quantity': int(item.get('quantity', 1)),
+            'price': float(item.get('price', 0)),
+            'amount': float(item.get('price', 0)) * int(item.get('quantity', 1))
+        }
+        for item in invoice['items']
+    ]
+    # Label with the configured rate unless the invoice was taxed at another
+    # one, in which case show the rate it was actually taxed at
+    rate = float(settings.get('taxRate') or 0)
+    if abs(round(invoice['subtotal'] * rate / 100, 2) - invoice['tax']) > 0.01:
+        rate = round(invoice['tax'] / invoice['subtotal'] * 100, 1) if invoice['subtotal'] else 0
+    return compiled_template('bill', paper_size, format_type).render(
+        title=invoice['billNumber'],
+        bill_number=invoice['billNumber'],
+        restaurant_name=settings.get('restaurantName') or 'Restaurant POS',
+        address=settings.get('address'),
+        phone=settings.get('phone'),
+        table_name=invoice.get('tableName'),
+        time=local_time(invoice['timestamp'], tz_offset),
+        items=items,
+        subtotal=invoice['subtotal'],
+        tax=invoice['tax'],
+        total=invoice['total'],
+        tax_label=f"GST ({rate:g}%)",
+        money=lambda value: f"{symbol}{value:.2f}"
+    )
@@ -0,0 +1,121 @@
+import os
+from collections import defaultdict
+from datetime import timedelta, timezone
+from sqlalchemy import and_, or_, func, insert, update
+from sqlalchemy.exc import IntegrityError
+from models import db, Invoice, SalesRollup
+
+# Minutes east of UTC that define the restaurant's business day and hours,
+# e.g. 330 for India. Run `flask rebuild-sales-rollup` after changing it.
+BUSINESS_UTC_OFFSET = int(os.environ.get('BUSINESS_UTC_OFFSET', 0))
+REBUILD_BATCH_SIZE = 1000
+
+def local_bucket(timestamp):
+    """(day, hour) in business time for an invoice timestamp"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    local = timestamp + timedelta(minutes=BUSINESS_UTC_OFFSET)
+    return local.date(), local.hour
+
+def record_invoice(invoice):
+    """Add an invoice to its rollup row inside the caller's transaction.
+
+    The row is incremented with a single UPDATE so concurrent checkouts in
+    the same hour do not lose each other's totals; the first invoice of an
+    hour inserts the row in a savepoint, retrying as an UPDATE if another
+    transaction inserted it first.
+    """
+    day, hour = local_bucket(invoice.timestamp)
+    key = and_(
+        SalesRollup.day == day,
+        SalesRollup.hour == hour,
+        SalesRollup.order_type == invoice.order_type
+    )
+    increment = update(SalesRollup).where(key).values(
+        orders=SalesRollup.orders + 1,
+        subtotal=SalesRollup.subtotal + invoice.subtotal,
+        tax=SalesRollup.tax + invoice.tax,
+        total=SalesRollup.total + invoice.total
+    )
+    if db.session.execute(increment).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(SalesRollup(
+                day=day, hour=hour, order_type=invoice.order_type, orders=1,
+                subtotal=invoice.subtotal, tax=invoice.tax, total=invoice.total
+            ))
+    except IntegrityError:
+        db.session.execute(increment)
+
+def rebuild_sales_rollup():
+    """Recompute every rollup row from the invoices table; returns the row count"""
+    buckets = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+    query = db.session.query(
+        Invoice.timestamp, Invoice.order_type, Invoice.subtotal, Invoice.tax, Invoice.total
+    ).yield_per(REBUILD_BATCH_SIZE)
+    for timestamp, order_type, subtotal, tax, total in query:
+        day, hour = local_bucket(timestamp)
+        bucket = buckets[(day, hour, order_type)]
+        bucket[0] += 1
+        bucket[1] += subtotal
+        bucket[2] += tax
+        bucket[3] += total
+
+    db.session.query(SalesRollup).delete(synchronize_session=False)
+    rows = [
+        {
+            'day': day, 'hour': hour, 'order_type': order_type,
+            'orders': orders, 'subtotal': subtotal, 'tax': tax, 'total': total
+        }
+        for (day, hour, order_type), (orders, subtotal, tax, total) in buckets.items()
+    ]
+    if rows:
+        db.session.execute(insert(SalesRollup), rows)
+    db.session.commit()
+    return len(rows)
+
+def covers_range(start, end, tz_offset):
+    """True if the rollup can answer a report for [start, end) in tz_offset.
+
+    The caller's hours must be the business hours and both bounds must fall
+    on an hour boundary, otherwise the report has to scan invoices.
+    """
+    if tz_offset != BUSINESS_UTC_OFFSET:
+        return False
+    for bound in (start, end):
+        if bound is not None:
+            local = bound + timedelta(minutes=BUSINESS_UTC_OFFSET)
+            if (local.minute, local.second, local.microsecond) != (0, 0, 0):
+                return False
+    return True
+
+def rollup_filters(start, end, order_type=None):
+    """Filters selecting the rollup rows for [start, end), bounds on hour boundaries"""
+    filters = []
+    if start is not None:
+        day, hour = local_bucket(start)
+        filters.append(or_(SalesRollup.day > day, and_(SalesRollup.day == day, SalesRollup.hour >= hour)))
+    if end is not None:
+        day, hour = local_bucket(end)
+        filters.append(or_(SalesRollup.day < day, and_(SalesRollup.day == day, SalesRollup.hour < hour)))
+    if order_type and order_type != 'all':
+        filters.append(SalesRollup.order_type == order_type)
+    return filters
+
+def rollup_summary_rows(start, end, order_type=None):
+    """Per-order-type totals and per-hour orders and revenue from the rollup"""
+    filters = rollup_filters(start, end, order_type)
+    by_type_rows = db.session.query(
+        SalesRollup.order_type,
+        func.sum(SalesRollup.orders),
+        func.sum(SalesRollup.subtotal),
+        func.sum(SalesRollup.tax),
+        func.sum(SalesRollup.total)
+    ).filter(*filters).group_by(SalesRollup.order_type).all()
+    hourly_rows = db.session.query(
+        SalesRollup.hour,
+        func.sum(SalesRollup.orders),
+        func.sum(SalesRollup.total)
+    ).filter(*filters).group_by(SalesRollup.hour).all()
+    return by_type_rows, hourly_rows
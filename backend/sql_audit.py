@@ -0,0 +1,194 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('sql_audit')
+
+# Opt-in: SQL_AUDIT=1 logs findings, SQL_AUDIT=raise also fails the request
+SQL_AUDIT = os.environ.get('SQL_AUDIT', '').lower()
+MAX_QUERIES = int(os.environ.get('SQL_AUDIT_MAX_QUERIES', 20))
+REPEAT_THRESHOLD = int(os.environ.get('SQL_AUDIT_REPEAT_THRESHOLD', 5))
+SLOW_QUERY_MS = float(os.environ.get('SQL_AUDIT_SLOW_MS', 100))
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER = re.compile(r'%\(\w+\)s|%s|\$\d+|:\w+')
+PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+WHITESPACE = re.compile(r'\s+')
+
+_local = threading.local()
+_listeners_lock = threading.Lock()
+_listeners_installed = False
+
+def statement_shape(statement):
+    """Statement text with literals, placeholders and IN lists collapsed.
+
+    Two executions of the same query with different values have the same
+    shape, which is what repeats inside a loop look like.
+    """
+    shape = STRING_LITERAL.sub('?', statement)
+    shape = PLACEHOLDER.sub('?', shape)
+    shape = NUMBER_LITERAL.sub('?', shape)
+    shape = PLACEHOLDER_LIST.sub('(?...)', shape)
+    return WHITESPACE.sub(' ', shape).strip()
+
+class QueryLog:
+    """Statements executed while the log was active, with their durations"""
+
+    def __init__(self):
+        self.statements = []
+
+    def record(self, statement, duration):
+        self.statements.append((statement_shape(statement), duration))
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    @property
+    def total_ms(self):
+        return sum(duration for _, duration in self.statements) * 1000
+
+    def repeated(self, threshold=REPEAT_THRESHOLD):
+        """Shapes executed at least threshold times, most frequent first"""
+        counts = Counter(shape for shape, _ in self.statements)
+        return [(shape, count) for shape, count in counts.most_common() if count >= threshold]
+
+    def slow(self, threshold_ms=SLOW_QUERY_MS):
+        return [(shape, duration * 1000) for shape, duration in self.statements if duration * 1000 >= threshold_ms]
+
+    def findings(self, max_queries=MAX_QUERIES, repeat_threshold=REPEAT_THRESHOLD, slow_ms=SLOW_QUERY_MS):
+        """Problems in this log as a list of dicts; a None limit skips that check"""
+        findings = []
+        if max_queries is not None and self.count > max_queries:
+            findings.append({'kind': 'too_many_queries', 'count': self.count, 'limit': max_queries})
+        if repeat_threshold is not None:
+            for shape, count in self.repeated(repeat_threshold):
+                findings.append({'kind': 'repeated_statement', 'statement': shape, 'count': count})
+        if slow_ms is not None:
+            for shape, duration_ms in self.slow(slow_ms):
+                findings.append({
+                    'kind': 'slow_statement', 'statement': shape,
+                    'duration_ms': round(duration_ms, 2), 'limit_ms': slow_ms
+                })
+        return findings
+
+def active_logs():
+    logs = getattr(_local, 'logs', None)
+    if logs is None:
+        logs = _local.logs = []
+    return logs
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if active_logs():
+        conn.info.setdefault('audit_query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('audit_query_start')
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    for log in active_logs():
+        log.record(statement, duration)
+
+def _handle_error(exception_context):
+    # A statement that raises skips after_cursor_execute; still pop its start
+    # so the pooled connection's stack stays balanced, and log the statement
+    conn = exception_context.connection
+    starts = conn.info.get('audit_query_start') if conn is not None else None
+    if exception_context.statement is None or not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    for log in active_logs():
+        log.record(exception_context.statement, duration)
+
+def install_listeners():
+    """Attach the cursor listeners to every engine, once per process"""
+    global _listeners_installed
+    with _listeners_lock:
+        if not _listeners_installed:
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(Engine, 'handle_error', _handle_error)
+            _listeners_installed = True
+
+@contextmanager
+def capture_queries():
+    """Record the statements this thread executes inside the block"""
+    install_listeners()
+    log = QueryLog()
+    active_logs().append(log)
+    try:
+        yield log
+    finally:
+        active_logs().remove(log)
+
+def format_findings(findings):
+    return '\n'.join(json.dumps(finding) for finding in findings)
+
+@contextmanager
+def assert_query_budget(max_queries=MAX_QUERIES, repeat_threshold=REPEAT_THRESHOLD, slow_ms=None):
+    """Fail with AssertionError if the block exceeds the query budget.
+
+    For tests and scripts, e.g. to keep an endpoint from growing an N+1:
+
+        with assert_query_budget(max_queries=3):
+            client.get('/api/floor')
+
+    Slow statements are only checked when slow_ms is given, since test
+    timings are noisy.
+    """
+    with capture_queries() as log:
+        yield log
+    findings = log.findings(max_queries, repeat_threshold, slow_ms)
+    if findings:
+        raise AssertionError(f"Query budget exceeded ({log.count} statements):\n{format_findings(findings)}")
+
+def init_sql_audit(app):
+    """Log N+1 patterns and slow statements per request when SQL_AUDIT is set"""
+    if SQL_AUDIT in ('', '0', 'false', 'off'):
+        return
+    install_listeners()
+    raise_on_findings = SQL_AUDIT == 'raise'
+
+    @app.before_request
+    def start_sql_audit():
+        g.sql_audit_log = QueryLog()
+        active_logs().append(g.sql_audit_log)
+
+    @app.after_request
+    def check_sql_audit(response):
+        log = g.pop('sql_audit_log', None)
+        if log is None:
+            return response
+        active_logs().remove(log)
+        findings = log.findings()
+        if findings:
+            logger.warning(json.dumps({
+                'event': 'sql_audit',
+                'method': request.method,
+                'route': request.url_rule.rule if request.url_rule is not None else request.path,
+                'path': request.path,
+                'status': response.status_code,
+                'statements': log.count,
+                'sql_ms': round(log.total_ms, 2),
+                'findings': findings
+            }))
+            if raise_on_findings:
+                raise AssertionError(f"SQL audit failed for {request.method} {request.path}:\n{format_findings(findings)}")
+        return response
+
+    @app.teardown_request
+    def stop_sql_audit(error):
+        # after_request does not run when a view raises
+        log = g.pop('sql_audit_log', None)
+        if log is not None and log in active_logs():
+            active_logs().remove(log)
@@ -2,5 +2,5 @@
 # Wait for database to be ready
 echo "Starting database initialization..."
 python init_db.py
-echo "Starting Flask application..."
-python app.py
\ No newline at end of file
+echo "Starting application server..."
+exec gunicorn --config gunicorn.conf.py wsgi:app
\ No newline at end of file
@@ -0,0 +1,31 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# app.py reads DATABASE_URL at import, so point it at a throwaway database first
+database_dir = tempfile.mkdtemp(prefix='pos-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(database_dir, 'test.db')}"
+
+from flask_migrate import upgrade  # noqa: E402
+from app import app as flask_app, db, catalog_cache  # noqa: E402
+
+@pytest.fixture
+def app():
+    """The app on a freshly migrated, empty database"""
+    with flask_app.app_context():
+        db.drop_all()
+        db.session.execute(db.text('DROP TABLE IF EXISTS alembic_version'))
+        db.session.commit()
+        upgrade(directory=os.path.join(BACKEND_DIR, 'migrations'))
+        catalog_cache.bump()
+        yield flask_app
+        db.session.remove()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,14 @@
+from app import cache_ttl, MULTI_WORKER_CACHE_TTL
+
+def test_caches_expire_by_default_with_several_workers(monkeypatch):
+    monkeypatch.delenv('CATALOG_CACHE_TTL', raising=False)
+    monkeypatch.setenv('WEB_CONCURRENCY', '2')
+    assert cache_ttl('CATALOG_CACHE_TTL') == MULTI_WORKER_CACHE_TTL
+
+    monkeypatch.setenv('WEB_CONCURRENCY', '1')
+    assert cache_ttl('CATALOG_CACHE_TTL') is None
+
+def test_configured_ttl_wins(monkeypatch):
+    monkeypatch.setenv('WEB_CONCURRENCY', '4')
+    monkeypatch.setenv('CATALOG_CACHE_TTL', '30')
+    assert cache_ttl('CATALOG_CACHE_TTL') == 30
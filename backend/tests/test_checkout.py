@@ -0,0 +1,21 @@
+from models import db, Table, RestaurantSettings
+
+def test_checkout_uses_the_tax_rate_in_the_database(client):
+    db.session.add(Table(id='t1', name='T1', seats=4, category='Main', status='available'))
+    db.session.add(RestaurantSettings(restaurant_name='Test', currency='INR', tax_rate=5.0))
+    db.session.commit()
+    # Warm this worker's settings cache, then change the rate as another worker would
+    assert client.get('/api/restaurant-settings').json['taxRate'] == 5.0
+    RestaurantSettings.query.one().tax_rate = 18.0
+    db.session.commit()
+
+    client.post('/api/orders/table/t1', json={
+        'table_name': 'T1',
+        'items': [{'id': 'm1', 'name': 'Soup', 'price': 100, 'quantity': 1}]
+    })
+    response = client.post('/api/orders/table/t1/checkout')
+
+    assert response.status_code == 201
+    assert (response.json['subtotal'], response.json['tax'], response.json['total']) == (100, 18, 118)
+    assert client.get('/api/orders/table/t1').json is None
+    assert Table.query.get('t1').status == 'available'
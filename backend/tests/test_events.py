@@ -0,0 +1,36 @@
+import json
+
+from events import EventBroker
+
+def test_streams_beyond_the_limit_are_refused():
+    broker = EventBroker(max_streams=1)
+
+    first = broker.subscribe()
+    assert first is not None
+    assert broker.subscribe() is None
+
+    broker.unsubscribe(first)
+    assert broker.subscribe() is not None
+
+def test_close_ends_open_streams():
+    broker = EventBroker()
+    stream = broker.stream(broker.subscribe(), stream_seconds=60)
+    assert next(stream).startswith('retry:')
+
+    broker.publish('table.updated', {'id': 'T1'})
+    event = next(stream)
+    assert 'event: table.updated' in event
+    assert json.loads(event.split('data: ')[1]) == {'id': 'T1'}
+
+    broker.close()
+    assert list(stream) == []
+    assert broker.subscribe() is None
+
+def test_event_stream_is_refused_when_full(client, monkeypatch):
+    from app import broker
+
+    monkeypatch.setattr(broker, 'max_streams', 0)
+    response = client.get('/api/events')
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '30'
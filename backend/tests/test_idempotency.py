@@ -0,0 +1,52 @@
+from models import db, Table, TableOrder, IdempotencyKey
+from idempotency import reserve_key
+
+ITEMS = {'table_name': 'T1', 'items': [{'id': 'm1', 'name': 'Soup', 'price': 100, 'quantity': 1}]}
+
+def add_table():
+    db.session.add(Table(id='t1', name='T1', seats=4, category='Main', status='available'))
+    db.session.commit()
+
+def post_items(client, key, body=ITEMS):
+    return client.post('/api/orders/table/t1', json=body, headers={'Idempotency-Key': key})
+
+def test_retry_replays_the_stored_response(client):
+    add_table()
+
+    first = post_items(client, 'k1')
+    retry = post_items(client, 'k1')
+
+    assert retry.status_code == first.status_code
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.json == first.json
+    assert len(TableOrder.query.filter_by(table_id='t1').one().to_dict()['items']) == 1
+
+def test_key_reused_for_a_different_request_is_rejected(client):
+    add_table()
+    post_items(client, 'k1')
+
+    response = post_items(client, 'k1', {**ITEMS, 'table_name': 'Other'})
+
+    assert response.status_code == 422
+
+def test_request_still_in_progress_gets_409(client):
+    add_table()
+    post_items(client, 'k1')
+    record = IdempotencyKey.query.get('k1')
+    record.status_code = None
+    db.session.commit()
+
+    assert post_items(client, 'k1').status_code == 409
+
+def test_reservation_rolls_back_with_an_unfinished_write(app, client):
+    add_table()
+
+    # A worker killed before its commit: the reservation goes with the write
+    with app.test_request_context('/api/orders/table/t1', method='POST'):
+        assert reserve_key('k1', 'fingerprint') is None
+        db.session.rollback()
+    assert db.session.get(IdempotencyKey, 'k1') is None
+
+    response = post_items(client, 'k1')
+    assert response.status_code < 300
+    assert 'Idempotent-Replayed' not in response.headers
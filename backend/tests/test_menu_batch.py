@@ -0,0 +1,86 @@
+from models import db, MenuItem
+
+def add_items(*codes):
+    for number, code in enumerate(codes, start=1):
+        db.session.add(MenuItem(
+            id=str(number), name=f'Item {number}', product_code=code,
+            price=10, category='Mains', department='Kitchen'
+        ))
+    db.session.commit()
+
+def codes_by_id():
+    return {item.id: item.product_code for item in MenuItem.query}
+
+def test_update_can_take_a_code_freed_by_an_earlier_update(client):
+    add_items('CS001', 'CS002')
+
+    # Item 2 frees CS002 before item 1 takes it, the reverse of primary key order
+    response = client.post('/api/menu-items/batch', json={'operations': [
+        {'op': 'update', 'id': '2', 'item': {'productCode': 'NEW'}},
+        {'op': 'update', 'id': '1', 'item': {'productCode': 'CS002'}}
+    ]})
+
+    assert response.status_code == 200
+    assert [result['status'] for result in response.json['results']] == ['updated', 'updated']
+    assert codes_by_id() == {'1': 'CS002', '2': 'NEW'}
+
+def test_update_cannot_take_a_code_still_in_use(client):
+    add_items('CS001', 'CS002')
+
+    response = client.post('/api/menu-items/batch', json={'operations': [
+        {'op': 'update', 'id': '1', 'item': {'productCode': 'CS002'}},
+        {'op': 'update', 'id': '2', 'item': {'productCode': 'CS001'}}
+    ]})
+
+    assert response.status_code == 400
+    assert response.json['results'][0]['status'] == 'error'
+    assert codes_by_id() == {'1': 'CS001', '2': 'CS002'}
+
+def test_non_object_operations_are_reported_per_operation(client):
+    add_items('CS001')
+
+    response = client.post('/api/menu-items/batch', json={'operations': [
+        1,
+        {'op': 'update', 'id': '1', 'item': {'price': 12}}
+    ], 'atomic': False})
+
+    assert response.status_code == 200
+    assert response.json['results'][0]['status'] == 'error'
+    assert response.json['results'][1]['status'] == 'updated'
+
+def test_update_cannot_blank_a_required_field(client):
+    add_items('CS001')
+
+    response = client.post('/api/menu-items/batch', json={'operations': [
+        {'op': 'update', 'id': '1', 'item': {'name': None}},
+        {'op': 'update', 'id': '1', 'item': {'category': ''}}
+    ], 'atomic': False})
+
+    assert [result['error'] for result in response.json['results']] == ['Missing name', 'Missing category']
+    assert MenuItem.query.get('1').name == 'Item 1'
+
+def test_create_ids_must_be_new(client):
+    add_items('CS001')
+
+    response = client.post('/api/menu-items/batch', json={'operations': [
+        {'op': 'create', 'item': {'id': '1', 'name': 'Taken', 'productCode': 'CS010',
+                                  'price': 5, 'category': 'Mains', 'department': 'Kitchen'}},
+        {'op': 'create', 'item': {'id': 'X', 'name': 'First', 'productCode': 'CS011',
+                                  'price': 5, 'category': 'Mains', 'department': 'Kitchen'}},
+        {'op': 'create', 'item': {'id': 'X', 'name': 'Repeat', 'productCode': 'CS012',
+                                  'price': 5, 'category': 'Mains', 'department': 'Kitchen'}}
+    ], 'atomic': False})
+
+    assert response.status_code == 200
+    assert [result['status'] for result in response.json['results']] == ['error', 'created', 'error']
+    assert codes_by_id() == {'1': 'CS001', 'X': 'CS011'}
+
+def test_batch_with_no_valid_operations_is_not_applied(client):
+    add_items('CS001')
+
+    response = client.post('/api/menu-items/batch', json={'operations': [
+        {'op': 'delete', 'id': 'missing'}
+    ], 'atomic': False})
+
+    assert response.status_code == 400
+    assert response.json['applied'] is False
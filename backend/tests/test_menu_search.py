@@ -0,0 +1,34 @@
+import menu_search
+from models import db, MenuItem
+from menu_search import mark_menu_changed
+
+def count_builds(monkeypatch):
+    builds = []
+    index_class = menu_search.MenuIndex
+
+    def build(items):
+        builds.append(len(items))
+        return index_class(items)
+    monkeypatch.setattr(menu_search, 'MenuIndex', build)
+    return builds
+
+def search(client, query):
+    return [item['name'] for item in client.get(f'/api/menu-items/search?q={query}').json['items']]
+
+def test_index_is_rebuilt_only_when_the_menu_changes(client, monkeypatch):
+    db.session.add(MenuItem(id='1', name='Paneer Tikka', product_code='P1', price=10,
+                            category='Mains', department='Kitchen'))
+    db.session.commit()
+    builds = count_builds(monkeypatch)
+
+    assert search(client, 'pan') == ['Paneer Tikka']
+    assert search(client, 'tik') == ['Paneer Tikka']
+    assert len(builds) == 1
+
+    # An update made through another worker: no local cache bump, only the version row
+    MenuItem.query.get('1').name = 'Paneer Butter Masala'
+    mark_menu_changed()
+    db.session.commit()
+
+    assert search(client, 'butter') == ['Paneer Butter Masala']
+    assert len(builds) == 2
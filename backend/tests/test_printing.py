@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+from models import db, Table
+
+def test_printed_times_use_the_callers_offset(client):
+    db.session.add(Table(id='t1', name='T1', seats=4, category='Main', status='available'))
+    db.session.commit()
+    client.post('/api/orders/table/t1', json={
+        'table_name': 'T1',
+        'items': [{'id': 'm1', 'name': 'Soup', 'price': 100, 'quantity': 1}]
+    })
+    invoice = client.post('/api/orders/table/t1/checkout').json
+
+    utc = client.get(f"/api/invoices/{invoice['id']}/print?tzOffset=0").get_data(as_text=True)
+    ist = client.get(f"/api/invoices/{invoice['id']}/print?tzOffset=330").get_data(as_text=True)
+
+    timestamp = datetime.fromisoformat(invoice['timestamp']).replace(tzinfo=None)
+    assert timestamp.strftime('%d/%m/%Y %I:%M %p') in utc
+    assert (timestamp + timedelta(minutes=330)).strftime('%d/%m/%Y %I:%M %p') in ist
+    assert client.get(f"/api/invoices/{invoice['id']}/print?tzOffset=abc").status_code == 400
+
+def test_bills_and_kots_keep_their_footers():
+    from printing import render_bill, render_kot, BILL_FORMATS, KOT_FORMATS
+
+    invoice = {
+        'billNumber': 'B1', 'timestamp': '2026-01-01T12:00:00', 'tableName': 'T1',
+        'items': [{'name': 'Soup', 'price': 100, 'quantity': 1}],
+        'subtotal': 100, 'tax': 5, 'total': 105
+    }
+    for format_type in BILL_FORMATS:
+        html = render_bill(invoice, {'formatType': format_type}, {'taxRate': 5})
+        assert 'Thank you for dining with us!' in html
+        assert 'Generated by Restaurant POS' in html
+
+    kot = {'kotNumber': 'K1', 'timestamp': '2026-01-01T12:00:00', 'tableName': 'T1'}
+    ticket = {'department': 'Kitchen', 'items': [{'name': 'Soup', 'quantity': 1}]}
+    for format_type in KOT_FORMATS:
+        assert 'Generated by' in render_kot(kot, ticket, {'formatType': format_type})
@@ -0,0 +1,86 @@
+import pytest
+from models import db, Table
+from sql_audit import QueryLog, assert_query_budget, statement_shape
+
+def seat_tables(client, count):
+    for number in range(count):
+        db.session.add(Table(id=f't{number}', name=f'T{number}', seats=4, category='Main', status='available'))
+    db.session.commit()
+    for number in range(count):
+        client.post(f'/api/orders/table/t{number}', json={
+            'table_name': f'T{number}',
+            'items': [{'id': 'm1', 'name': 'Soup', 'price': 100, 'quantity': 1}]
+        })
+
+def kot_items(count):
+    return [
+        {'id': f'm{number}', 'name': f'Dish {number}', 'price': 10, 'quantity': 1,
+         'department': f'Station {number % 4}'}
+        for number in range(count)
+    ]
+
+def test_floor_and_orders_take_one_query_however_many_tables(client):
+    seat_tables(client, 12)
+
+    with assert_query_budget(max_queries=1):
+        assert len(client.get('/api/floor').json) == 12
+    with assert_query_budget(max_queries=1):
+        assert len(client.get('/api/orders').json) == 12
+
+def test_kot_queries_do_not_grow_with_items_or_departments(client):
+    seat_tables(client, 1)
+    # Warm up the KOT config and counters, which are created on first use
+    client.post('/api/orders/table/t0/kot', json={'table_name': 'T0', 'items': kot_items(1)})
+
+    with assert_query_budget(max_queries=10) as log:
+        assert client.post('/api/orders/table/t0/kot', json={'table_name': 'T0', 'items': kot_items(20)}).status_code < 300
+    table_kot_queries = log.count
+    with assert_query_budget(max_queries=table_kot_queries):
+        client.post('/api/orders/table/t0/kot', json={'table_name': 'T0', 'items': kot_items(40)})
+
+    with assert_query_budget(max_queries=5):
+        assert client.post('/api/kot', json={'items': kot_items(20)}).status_code < 300
+
+def test_statement_shape_collapses_values():
+    assert statement_shape("SELECT * FROM t WHERE name = 'O''Brien' AND price > 12.5") == \
+        "SELECT * FROM t WHERE name = ? AND price > ?"
+    assert statement_shape('SELECT * FROM t WHERE a = %(a_1)s AND b = :b AND c = $1 AND d = ?') == \
+        'SELECT * FROM t WHERE a = ? AND b = ? AND c = ? AND d = ?'
+    assert statement_shape('SELECT *\n  FROM t WHERE id IN (?, ?, ?)') == 'SELECT * FROM t WHERE id IN (?...)'
+    assert statement_shape('SELECT * FROM t WHERE id IN (1, 2)') == statement_shape('SELECT * FROM t WHERE id IN (3,4,5)')
+
+def test_repeated_shapes_are_reported():
+    log = QueryLog()
+    for number in range(5):
+        log.record(f'SELECT * FROM menu_items WHERE id = {number}', 0.001)
+    log.record('SELECT * FROM tables', 0.001)
+
+    assert log.repeated(5) == [('SELECT * FROM menu_items WHERE id = ?', 5)]
+    assert log.repeated(6) == []
+    assert [finding['kind'] for finding in log.findings(max_queries=None)] == ['repeated_statement']
+
+def test_budget_fails_on_an_n_plus_one(client):
+    seat_tables(client, 6)
+
+    with pytest.raises(AssertionError, match='repeated_statement'):
+        with assert_query_budget(max_queries=None, repeat_threshold=5):
+            for number in range(6):
+                db.session.get(Table, f't{number}')
+                db.session.expire_all()
+
+def test_failed_statements_are_recorded_and_unwound(app):
+    from sqlalchemy.exc import OperationalError
+    from metrics import SQL_ERRORS, SQL_STATEMENTS
+    from sql_audit import capture_queries
+
+    errors, statements = SQL_ERRORS._values.get((), 0), SQL_STATEMENTS._values.get((), 0)
+    with db.engine.connect() as conn, capture_queries() as log:
+        with pytest.raises(OperationalError):
+            conn.execute(db.text('SELECT * FROM no_such_table'))
+        conn.execute(db.text('SELECT 1'))
+
+        assert not conn.info.get('metrics_query_start')
+        assert not conn.info.get('audit_query_start')
+    assert [shape for shape, _ in log.statements] == ['SELECT * FROM no_such_table', 'SELECT ?']
+    assert SQL_ERRORS._values.get((), 0) == errors + 1
+    assert SQL_STATEMENTS._values.get((), 0) == statements + 2
@@ -0,0 +1,10 @@
+import logging
+from app import app, connect_db
+
+logger = logging.getLogger(__name__)
+
+# With preload_app this runs once in the gunicorn master, before workers fork
+try:
+    connect_db()
+except Exception as e:
+    logger.error(f"Failed to connect to database after retries: {e}")
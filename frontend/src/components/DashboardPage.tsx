@@ -33,84 +33,54 @@ export const DashboardPage: React.FC = () => {
 
   useEffect(() => {
     loadDashboardData();
-    // Refresh every 5 minutes
-    const interval = setInterval(loadDashboardData, 300000);
-    return () => clearInterval(interval);
+    // Refresh when invoices or tables change, coalescing bursts of events
+    // into a single reload
+    let reloadTimer: ReturnType<typeof setTimeout> | undefined;
+    const unsubscribe = api.subscribeToEvents((type) => {
+      if (type === 'invoice.created' || type.startsWith('table.')) {
+        clearTimeout(reloadTimer);
+        reloadTimer = setTimeout(loadDashboardData, 2000);
+      }
+    });
+    // Events only cover changes made through this terminal's server worker,
+    // so still refresh every minute
+    const interval = setInterval(loadDashboardData, 60000);
+    return () => {
+      clearTimeout(reloadTimer);
+      clearInterval(interval);
+      unsubscribe();
+    };
   }, []);
 
   const loadDashboardData = async () => {
     try {
-      const [invoices, tables] = await Promise.all([
-        api.getInvoices(),
-        api.getTables()
-      ]);
-
       const now = new Date();
       const todayStart = new Date(now.getFullYear(), now.getMonth(), now.getDate());
       const yesterdayStart = new Date(todayStart);
       yesterdayStart.setDate(yesterdayStart.getDate() - 1);
 
-      // Filter today's and yesterday's invoices
-      const todayInvoices = invoices.filter((inv: any) => {
-        const invDate = new Date(inv.timestamp);
-        return invDate >= todayStart;
-      });
-
-      const yesterdayInvoices = invoices.filter((inv: any) => {
-        const invDate = new Date(inv.timestamp);
-        return invDate >= yesterdayStart && invDate < todayStart;
-      });
-
-      // Calculate stats
-      const todaySales = todayInvoices.reduce((sum: number, inv: any) => sum + inv.total, 0);
-      const yesterdaySales = yesterdayInvoices.reduce((sum: number, inv: any) => sum + inv.total, 0);
-      const todayOrders = todayInvoices.length;
-      const yesterdayOrders = yesterdayInvoices.length;
-      const averageOrderValue = todayOrders > 0 ? todaySales / todayOrders : 0;
-
-      // Calculate sales by type
-      const salesByType = todayInvoices.reduce(
-        (acc: any, inv: any) => {
-          if (inv.orderType === 'dine-in') {
-            acc.dineIn += inv.total;
-          } else {
-            acc.takeaway += inv.total;
-          }
-          return acc;
-        },
-        { dineIn: 0, takeaway: 0 }
-      );
-
-      // Top selling items
-      const itemSales: Record<string, { quantity: number; revenue: number; name: string }> = {};
-      todayInvoices.forEach((inv: any) => {
-        inv.items.forEach((item: any) => {
-          if (!itemSales[item.id]) {
-            itemSales[item.id] = { name: item.name, quantity: 0, revenue: 0 };
-          }
-          itemSales[item.id].quantity += item.quantity;
-          itemSales[item.id].revenue += item.price * item.quantity;
-        });
-      });
-
-      const topSellingItems = Object.values(itemSales)
-        .sort((a, b) => b.revenue - a.revenue)
-        .slice(0, 5);
+      // Totals, sales by type and peak hour come pre-aggregated from the server
+      const [today, yesterday, topItems, tables] = await Promise.all([
+        api.getReportSummary(todayStart),
+        api.getReportSummary(yesterdayStart, todayStart),
+        api.getTopItems({ from: todayStart }, "revenue", 5),
+        api.getTables()
+      ]);
 
-      // Peak hour analysis
-      const hourSales: Record<number, number> = {};
-      todayInvoices.forEach((inv: any) => {
-        const hour = new Date(inv.timestamp).getHours();
-        hourSales[hour] = (hourSales[hour] || 0) + inv.total;
-      });
+      const todaySales = today.totalRevenue;
+      const yesterdaySales = yesterday.totalRevenue;
+      const todayOrders = today.totalOrders;
+      const yesterdayOrders = yesterday.totalOrders;
+      const averageOrderValue = today.averageOrderValue;
+      const salesByType = {
+        dineIn: today.dineInRevenue,
+        takeaway: today.totalRevenue - today.dineInRevenue
+      };
 
-      const peakHourNum = Object.entries(hourSales).reduce(
-        (max, [hour, sales]) => (sales > max.sales ? { hour: parseInt(hour), sales } : max),
-        { hour: 0, sales: 0 }
-      );
+      const topSellingItems = topItems.map(({ name, quantity, revenue }) => ({ name, quantity, revenue }));
 
-      const peakHour = peakHourNum.sales > 0
-        ? `${peakHourNum.hour}:00 - ${peakHourNum.hour + 1}:00`
+      const peakHour = today.peakHour !== null
+        ? `${today.peakHour}:00 - ${today.peakHour + 1}:00`
         : "N/A";
 
       // Table stats
@@ -6,7 +6,9 @@ import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogDescription } f
 import { Plus, ShoppingCart, Trash2, Printer, Clock, Search, ChevronLeft } from "lucide-react";
 import { Input } from "./ui/input";
 import { useRestaurant } from "../contexts/RestaurantContext";
+import { useMenuSearch } from "../hooks/useMenuSearch";
 import * as api from "../services/api";
+import { openPrintWindow } from "../services/print";
 import { MenuItem, Table } from "../types";
 
 interface CartItem {
@@ -34,11 +36,9 @@ export const DineInPage: React.FC = () => {
   const {
     tables,
     setTables,
-    addItemsToTable,
     getTableOrder,
-    completeTableOrder,
-    markItemsAsSent,
-    addInvoice,
+    sendToKitchen,
+    checkoutTable,
     kotConfig,
     billConfig,
   } = useRestaurant();
@@ -101,23 +101,9 @@ export const DineInPage: React.FC = () => {
   useEffect(() => {
     const loadTables = async () => {
       try {
+        // Table orders are loaded by the RestaurantContext via /api/floor
         const loadedTables = await api.getTables();
         setTables(loadedTables || []);
-
-        // Also load table orders for all tables
-        for (const table of loadedTables) {
-          if (table.status === 'occupied') {
-            try {
-              const order = await api.getTableOrder(table.id);
-              if (order) {
-                // Update the context with the loaded order
-                // This will be handled by the RestaurantContext
-              }
-            } catch (err) {
-              console.error(`Failed to load order for table ${table.id}`, err);
-            }
-          }
-        }
       } catch (err) {
         console.error("Failed to load tables", err);
       }
@@ -208,24 +194,12 @@ export const DineInPage: React.FC = () => {
     return data;
   }, [tables, selectedTable]);
 
-  const existingTableOrder = useMemo(() => {
-    const order = selectedTable ? getTableOrder(selectedTable) : undefined;
-    console.log("Existing table order:", order);
-    return order;
-  }, [selectedTable, getTableOrder]);
-
+  // Typed searches go to the server's menu index; browsing filters by category
+  const searchResults = useMenuSearch(searchQuery, selectedCategory);
   const filteredItems = useMemo(() => {
-    const q = searchQuery.trim().toLowerCase();
-    return menuItems.filter((item) => {
-      const byCat = selectedCategory === "All" || item.category === selectedCategory;
-      const bySearch =
-        !q ||
-        item.name?.toLowerCase().includes(q) ||
-        item.productCode?.toLowerCase().includes(q) ||
-        item.description?.toLowerCase().includes(q);
-      return byCat && bySearch;
-    });
-  }, [menuItems, selectedCategory, searchQuery]);
+    if (searchResults) return searchResults;
+    return menuItems.filter((item) => selectedCategory === "All" || item.category === selectedCategory);
+  }, [menuItems, selectedCategory, searchResults]);
 
   const getPendingItems = useCallback(() => currentOrder.filter((it) => !it.sentToKitchen), [currentOrder]);
 
@@ -362,443 +336,21 @@ export const DineInPage: React.FC = () => {
     // Don't clear the selected table when holding an order
   }, []);
 
-  const generateKOTContent = useCallback(
-    (items: CartItem[], isAdditional = false, department?: string) => {
-      const now = new Date();
-      const orderNumber = `KOT-${Date.now()}`;
-
-      // Get paper size and format from context
-      const paperSize = kotConfig.paperSize || "80mm";
-      const formatType = kotConfig.formatType || "detailed";
-
-      // Adjust styling based on paper size
-      let fontSize = "12px";
-      let padding = "8px";
-      let maxWidth = "80mm";
-
-      if (paperSize === "58mm") {
-        fontSize = "10px";
-        padding = "5px";
-        maxWidth = "58mm";
-      } else if (paperSize === "112mm") {
-        fontSize = "14px";
-        padding = "12px";
-        maxWidth = "112mm";
-      }
-
-      // Generate content based on format type
-      let content = "";
-
-      if (formatType === "compact") {
-        // Compact format
-        content = `<!doctype html><html><head><meta charset="utf-8"><title>${orderNumber}</title><style>
-          body {
-            font-family: Arial, Helvetica, sans-serif;
-            font-size: ${fontSize};
-            padding: ${padding};
-            max-width: ${maxWidth};
-            margin: 0 auto;
-            box-sizing: border-box;
-          }
-          .h {
-            text-align: center;
-            font-weight: 700;
-          }
-          hr {
-            border: none;
-            border-top: 1px dashed #000;
-            margin: 5px 0;
-          }
-          @media print {
-            @page {
-              size: ${maxWidth} auto;
-              margin: 0;
-            }
-            body {
-              width: ${maxWidth};
-              max-width: ${maxWidth};
-              padding: ${padding};
-              margin: 0;
-            }
-          }
-        </style></head><body>` +
-          `<div class="h">KOT</div>` +
-          (department ? `<div style="text-align:center">[${department}]</div>` : "") +
-          (isAdditional ? `<div style="text-align:center;font-weight:700;margin:5px 0">*** ADDITIONAL ***</div>` : "") +
-          `<div>${now.toLocaleString()}</div>` +
-          `<div>Table: ${selectedTableData?.name || 'N/A'}</div>` +
-          `<hr/>` +
-          items
-            .map((it) => `<div>${it.name} x ${it.quantity}</div>`)
-            .join("") +
-          `<hr/><div style="text-align:center">Generated by POS</div></body></html>`;
-      } else if (formatType === "grouped") {
-        // Grouped by department format
-        const groupedItems: Record<string, CartItem[]> = {};
-        items.forEach(item => {
-          const dept = item.department || "General";
-          if (!groupedItems[dept]) {
-            groupedItems[dept] = [];
-          }
-          groupedItems[dept].push(item);
-        });
-
-        content = `<!doctype html><html><head><meta charset="utf-8"><title>${orderNumber}</title><style>
-          body {
-            font-family: Arial, Helvetica, sans-serif;
-            font-size: ${fontSize};
-            padding: ${padding};
-            max-width: ${maxWidth};
-            margin: 0 auto;
-            box-sizing: border-box;
-          }
-          .h {
-            text-align: center;
-            font-weight: 700;
-          }
-          hr {
-            border: none;
-            border-top: 1px dashed #000;
-            margin: 5px 0;
-          }
-          @media print {
-            @page {
-              size: ${maxWidth} auto;
-              margin: 0;
-            }
-            body {
-              width: ${maxWidth};
-              max-width: ${maxWidth};
-              padding: ${padding};
-              margin: 0;
-            }
-          }
-        </style></head><body>` +
-          `<div class="h">KITCHEN ORDER TICKET</div>` +
-          (isAdditional ? `<div style="text-align:center;font-weight:700;margin:5px 0">*** ADDITIONAL ITEMS ***</div>` : "") +
-          `<div>Date: ${now.toLocaleString()}</div>` +
-          `<div>Table: ${selectedTableData?.name || 'N/A'}</div>` +
-          `<hr/>`;
-
-        Object.entries(groupedItems).forEach(([dept, deptItems]) => {
-          content += `<div style="font-weight:700;margin-top:10px">[${dept}]</div>`;
-          deptItems.forEach(it => {
-            content += `<div><strong>${it.name}</strong> x ${it.quantity}</div>`;
-          });
-        });
-
-        content += `<hr/><div style="text-align:center">Generated by Restaurant POS</div></body></html>`;
-      } else {
-        // Detailed format (default)
-        content = `<!doctype html><html><head><meta charset="utf-8"><title>${orderNumber}</title><style>
-          body {
-            font-family: Arial, Helvetica, sans-serif;
-            font-size: ${fontSize};
-            padding: ${padding};
-            max-width: ${maxWidth};
-            margin: 0 auto;
-            box-sizing: border-box;
-          }
-          .h {
-            text-align: center;
-            font-weight: 700;
-          }
-          hr {
-            border: none;
-            border-top: 1px dashed #000;
-            margin: 5px 0;
-          }
-          @media print {
-            @page {
-              size: ${maxWidth} auto;
-              margin: 0;
-            }
-            body {
-              width: ${maxWidth};
-              max-width: ${maxWidth};
-              padding: ${padding};
-              margin: 0;
-            }
-          }
-        </style></head><body>` +
-          `<div class="h">KITCHEN ORDER TICKET</div>` +
-          (department ? `<div style="text-align:center">[${department}]</div>` : "") +
-          (isAdditional ? `<div style="text-align:center;font-weight:700;margin:5px 0">*** ADDITIONAL ITEMS ***</div>` : "") +
-          `<div>Date: ${now.toLocaleString()}</div>` +
-          `<div>Table: ${selectedTableData?.name || 'N/A'}</div>` +
-          `<hr/>` +
-          items
-            .map((it) => `<div><strong>${it.name}</strong> x ${it.quantity} <span style="float:right">[${it.department || "General"}]</span></div>`)
-            .join("") +
-          `<hr/><div style="text-align:center">Generated by Restaurant POS</div></body></html>`;
-      }
-
-      return content;
-    },
-    [kotConfig, selectedTableData?.name]
-  );
-
-  const printKOT = useCallback(
-    async (items: CartItem[], isAdditional = false) => {
-      const popup = window.open("", "_blank", "width=400,height=600");
-      if (!popup) return;
-
-      // Get paper size from context
-      const paperSize = kotConfig.paperSize || "80mm";
-
-      // Set width based on paper size
-      let windowWidth = 400;
-      if (paperSize === "58mm") {
-        windowWidth = 300;
-      } else if (paperSize === "112mm") {
-        windowWidth = 500;
-      }
-
-      // Resize window to match paper size
-      popup.resizeTo(windowWidth, 600);
-
-      popup.document.write(generateKOTContent(items, isAdditional));
-      popup.document.close();
-
-      // Add print-specific styling
-      const printStyle = popup.document.createElement('style');
-      printStyle.innerHTML = `
-        @media print {
-          @page {
-            size: ${paperSize === "58mm" ? "58mm" : paperSize === "112mm" ? "112mm" : "80mm"} auto;
-            margin: 0;
-          }
-          body {
-            width: ${paperSize === "58mm" ? "58mm" : paperSize === "112mm" ? "112mm" : "80mm"};
-            margin: 0;
-            padding: 0;
-          }
-        }
-      `;
-      popup.document.head.appendChild(printStyle);
-
-      setTimeout(() => {
-        popup.print();
-        popup.close();
-      }, 200);
-    },
-    [generateKOTContent, kotConfig]
-  );
-
-  const generateBillContent = useCallback(() => {
-    const now = new Date();
-    const billNumber = `BILL-${Date.now()}`;
-
-    // Get all items from current order and existing table order
-    const allItems = [...getAllCombinedItems()];
-    if (existingTableOrder) {
-      allItems.push(...existingTableOrder.items);
-    }
-
-    const sub = allItems.reduce((s, i) => s + i.price * i.quantity, 0);
-    const t = sub * 0.05;
-    const tot = sub + t;
-
-    // Get paper size and format from context
-    const paperSize = billConfig.paperSize || "80mm";
-    const formatType = billConfig.formatType || "standard";
-
-    // Adjust styling based on paper size
-    let fontSize = "12px";
-    let padding = "8px";
-    let maxWidth = "80mm";
-
-    if (paperSize === "58mm") {
-      fontSize = "10px";
-      padding = "5px";
-      maxWidth = "58mm";
-    } else if (paperSize === "112mm") {
-      fontSize = "14px";
-      padding = "12px";
-      maxWidth = "112mm";
-    }
-
-    let content = "";
-
-    if (formatType === "compact") {
-      // Compact bill format
-      content = `<!doctype html><html><head><meta charset="utf-8"><title>${billNumber}</title><style>
-        body {
-          font-family: Arial, Helvetica, sans-serif;
-          font-size: ${fontSize};
-          padding: ${padding};
-          max-width: ${maxWidth};
-          margin: 0 auto;
-          box-sizing: border-box;
-        }
-        hr {
-          border: none;
-          border-top: 1px dashed #000;
-          margin: 5px 0;
-        }
-        @media print {
-          @page {
-            size: ${maxWidth} auto;
-            margin: 0;
-          }
-          body {
-            width: ${maxWidth};
-            max-width: ${maxWidth};
-            padding: ${padding};
-            margin: 0;
-          }
-        }
-      </style></head><body>` +
-        `<div style="text-align:center;font-weight:700">TAX INVOICE</div>` +
-        `<div>Bill: ${billNumber}</div><div>${now.toLocaleString()}</div>` +
-        `<div>Table: ${selectedTableData?.name || 'N/A'}</div>` +
-        `<hr/>` +
-        allItems.map(i => `<div>${i.name} (${i.quantity} x ₹${i.price.toFixed(2)}) ₹${(i.quantity * i.price).toFixed(2)}</div>`).join("") +
-        `<hr/>` +
-        `<div>Subtotal: ₹${sub.toFixed(2)}</div>` +
-        `<div>GST (5%): ₹${t.toFixed(2)}</div>` +
-        `<div style="font-weight:700">TOTAL: ₹${tot.toFixed(2)}</div>` +
-        `</body></html>`;
-    } else if (formatType === "detailed") {
-      // Detailed bill format
-      content = `<!doctype html><html><head><meta charset="utf-8"><title>${billNumber}</title><style>
-        body {
-          font-family: Arial, Helvetica, sans-serif;
-          font-size: ${fontSize};
-          padding: ${padding};
-          max-width: ${maxWidth};
-          margin: 0 auto;
-          box-sizing: border-box;
-        }
-        hr {
-          border: none;
-          border-top: 1px dashed #000;
-          margin: 5px 0;
-        }
-        @media print {
-          @page {
-            size: ${maxWidth} auto;
-            margin: 0;
-          }
-          body {
-            width: ${maxWidth};
-            max-width: ${maxWidth};
-            padding: ${padding};
-            margin: 0;
-          }
-        }
-      </style></head><body>` +
-        `<div style="text-align:center;font-weight:700">RESTAURANT POS - TAX INVOICE</div>` +
-        `<div>Bill No: ${billNumber}</div><div>Date: ${now.toLocaleString()}</div>` +
-        `<div>Table: ${selectedTableData?.name || 'N/A'}</div>` +
-        `<hr/>` +
-        allItems.map(i => `<div>${i.name} (${i.quantity} x ₹${i.price.toFixed(2)}) <span style="float:right">₹${(i.quantity * i.price).toFixed(2)}</span></div>`).join("") +
-        `<hr/>` +
-        `<div>Subtotal <span style="float:right">₹${sub.toFixed(2)}</span></div>` +
-        `<div>GST (5%) <span style="float:right">₹${t.toFixed(2)}</span></div>` +
-        `<div style="font-weight:700">TOTAL <span style="float:right">₹${tot.toFixed(2)}</span></div>` +
-        `</body></html>`;
-    } else {
-      // Standard bill format (default)
-      content = `<!doctype html><html><head><meta charset="utf-8"><title>${billNumber}</title><style>
-        body {
-          font-family: Arial, Helvetica, sans-serif;
-          font-size: ${fontSize};
-          padding: ${padding};
-          max-width: ${maxWidth};
-          margin: 0 auto;
-          box-sizing: border-box;
-        }
-        hr {
-          border: none;
-          border-top: 1px dashed #000;
-          margin: 5px 0;
-        }
-        @media print {
-          @page {
-            size: ${maxWidth} auto;
-            margin: 0;
-          }
-          body {
-            width: ${maxWidth};
-            max-width: ${maxWidth};
-            padding: ${padding};
-            margin: 0;
-          }
-        }
-      </style></head><body>` +
-        `<div style="text-align:center;font-weight:700">RESTAURANT POS - TAX INVOICE</div>` +
-        `<div>Bill No: ${billNumber}</div><div>Date: ${now.toLocaleString()}</div>` +
-        `<div>Table: ${selectedTableData?.name || 'N/A'}</div>` +
-        `<hr/>` +
-        allItems.map(i => `<div>${i.name} (${i.quantity} x ₹${i.price.toFixed(2)}) <span style="float:right">₹${(i.quantity * i.price).toFixed(2)}</span></div>`).join("") +
-        `<hr/>` +
-        `<div>Subtotal <span style="float:right">₹${sub.toFixed(2)}</span></div>` +
-        `<div>GST (5%) <span style="float:right">₹${t.toFixed(2)}</span></div>` +
-        `<div style="font-weight:700">TOTAL <span style="float:right">₹${tot.toFixed(2)}</span></div>` +
-        `</body></html>`;
-    }
-
-    return content;
-  }, [getAllCombinedItems, billConfig, selectedTableData?.name, existingTableOrder]);
-
-  const printBill = useCallback(() => {
-    const popup = window.open("", "_blank", "width=400,height=600");
-    if (!popup) return;
-
-    // Get paper size from context
-    const paperSize = billConfig.paperSize || "80mm";
-
-    // Set width based on paper size
-    let windowWidth = 400;
-    if (paperSize === "58mm") {
-      windowWidth = 300;
-    } else if (paperSize === "112mm") {
-      windowWidth = 500;
-    }
-
-    // Resize window to match paper size
-    popup.resizeTo(windowWidth, 600);
-
-    popup.document.write(generateBillContent());
-    popup.document.close();
-
-    // Add print-specific styling
-    const printStyle = popup.document.createElement('style');
-    printStyle.innerHTML = `
-      @media print {
-        @page {
-          size: ${paperSize === "58mm" ? "58mm" : paperSize === "112mm" ? "112mm" : "80mm"} auto;
-          margin: 0;
-        }
-        body {
-          width: ${paperSize === "58mm" ? "58mm" : paperSize === "112mm" ? "112mm" : "80mm"};
-          margin: 0;
-          padding: 0;
-        }
-      }
-    `;
-    popup.document.head.appendChild(printStyle);
-
-    setTimeout(() => {
-      popup.print();
-      popup.close();
-    }, 200);
-  }, [generateBillContent, billConfig]);
-
   const placeOrder = useCallback(async () => {
     const pending = getPendingItems();
     if (!pending.length) return;
 
-    // Generate KOT when placing order
-    if (kotConfig.printByDepartment !== undefined) await printKOT(pending);
-
-    // Add items to table order in context
     if (selectedTable && selectedTableData) {
-      await addItemsToTable(selectedTable, selectedTableData.name, pending);
-
-      // Mark items as sent to kitchen
-      await markItemsAsSent(selectedTable);
+      // Open the print window while still handling the click
+      const printWindow = openPrintWindow(kotConfig.paperSize);
+      // Add the items and mark them sent in one request; the server returns
+      // the tickets already split by department and copy count
+      const kot = await sendToKitchen(selectedTable, selectedTableData.name, pending);
+      if (!kot) {
+        printWindow.close();
+        return;
+      }
+      printWindow.print(kot.tickets.map(ticket => ticket.html));
 
       // Reload the table order to show all items including sent ones
       const order = getTableOrder(selectedTable);
@@ -817,7 +369,7 @@ export const DineInPage: React.FC = () => {
       // Show dialog asking whether to generate bill or hold
       setShowHoldDialog(true);
     }
-  }, [getPendingItems, kotConfig, printKOT, selectedTable, selectedTableData, addItemsToTable, markItemsAsSent, getTableOrder]);
+  }, [getPendingItems, selectedTable, selectedTableData, sendToKitchen, getTableOrder, kotConfig]);
 
 
 
@@ -831,7 +383,7 @@ export const DineInPage: React.FC = () => {
     setShowBillDialog(true);
   }, []);
 
-  const generateBill = useCallback(async () => {
+  const generateBill = useCallback(async (print = false) => {
     if (!selectedTable || !selectedTableData) return;
 
     // Get all items from the table order
@@ -841,27 +393,26 @@ export const DineInPage: React.FC = () => {
       return;
     }
 
-    const allItems = order.items;
-    const sub = allItems.reduce((s: number, i: any) => s + i.price * i.quantity, 0);
-    const t = sub * 0.05;
-    const tot = sub + t;
-
-    const invoice = {
-      id: Date.now().toString(),
-      billNumber: `BILL-${Date.now()}`,
-      orderType: "dine-in",
-      tableName: selectedTableData.name,
-      items: allItems,
-      subtotal: sub,
-      tax: t,
-      total: tot,
-      timestamp: new Date(),
-    } as any;
+    // Open the print window while still handling the click
+    const printWindow = print ? openPrintWindow(billConfig.paperSize) : null;
 
-    await addInvoice(invoice);
+    // The server totals the order, writes the invoice and frees the table
+    // in one transaction
+    const invoice = await checkoutTable(selectedTable);
+    if (!invoice) {
+      printWindow?.close();
+      alert("Failed to generate bill. Please try again.");
+      return;
+    }
 
-    // Complete the table order (clears order and makes table available)
-    await completeTableOrder(selectedTable);
+    if (printWindow) {
+      try {
+        printWindow.print(await api.getInvoicePrint(invoice.id));
+      } catch (error) {
+        printWindow.close();
+        console.error("Error printing bill:", error);
+      }
+    }
 
     // Clear local state and localStorage
     setCurrentOrder([]);
@@ -870,7 +421,7 @@ export const DineInPage: React.FC = () => {
     setShowBillDialog(false);
 
     alert("Bill generated successfully! Table is now available.");
-  }, [selectedTable, selectedTableData, getTableOrder, addInvoice, completeTableOrder]);
+  }, [selectedTable, selectedTableData, getTableOrder, checkoutTable, billConfig]);
 
 
 
@@ -1198,10 +749,7 @@ export const DineInPage: React.FC = () => {
             </div>
             <div className="flex gap-2">
               <Button
-                onClick={() => {
-                  printBill();
-                  generateBill();
-                }}
+                onClick={() => generateBill(true)}
                 className="flex-1 text-white font-medium transition-all"
                 style={{ backgroundColor: '#6D9773' }}
                 onMouseEnter={(e: any) => e.currentTarget.style.backgroundColor = '#5A7F61'}
@@ -1210,7 +758,7 @@ export const DineInPage: React.FC = () => {
                 <Printer className="mr-2" /> Print & Complete
               </Button>
               <Button
-                onClick={generateBill}
+                onClick={() => generateBill()}
                 variant="outline"
                 className="flex-1"
                 style={{ borderColor: '#6D9773', color: '#0C3B2E' }}
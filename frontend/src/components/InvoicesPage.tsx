@@ -1,4 +1,4 @@
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import { Card, CardContent, CardHeader, CardTitle } from "./ui/card";
 import { Button } from "./ui/button";
 import { Badge } from "./ui/badge";
@@ -8,6 +8,8 @@ import { ScrollArea } from "./ui/scroll-area";
 import { Calendar, Printer, Search, Filter } from "lucide-react";
 import { useRestaurant } from "../contexts/RestaurantContext";
 import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle } from "./ui/dialog";
+import * as api from "../services/api";
+import { openPrintWindow } from "../services/print";
 
 // Define the invoice type
 interface OrderItem {
@@ -32,144 +34,97 @@ interface Invoice {
   timestamp: string | Date;
 }
 
+// Local-day bounds of the date filters; the end is the exclusive start of the next day
+const filterRange = (startDate: string, endDate: string) => {
+  const from = startDate ? new Date(startDate + "T00:00:00") : undefined;
+  let to: Date | undefined;
+  if (endDate) {
+    to = new Date(endDate + "T00:00:00");
+    to.setDate(to.getDate() + 1);
+  }
+  return { from, to };
+};
+
 export function InvoicesPage() {
-  const { invoices } = useRestaurant();
+  const { billConfig } = useRestaurant();
+  const [invoices, setInvoices] = useState<Invoice[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [summary, setSummary] = useState<api.ReportSummary | null>(null);
   const [searchTerm, setSearchTerm] = useState("");
   const [startDate, setStartDate] = useState("");
   const [endDate, setEndDate] = useState("");
   const [selectedInvoice, setSelectedInvoice] = useState<Invoice | null>(null);
   const [showInvoiceDialog, setShowInvoiceDialog] = useState(false);
 
-  const filteredInvoices = invoices.filter((invoice: Invoice) => {
-    // Handle potential timestamp conversion issues
-    let invoiceTimestamp: Date;
-    try {
-      if (typeof invoice.timestamp === 'string') {
-        // Handle ISO string format
-        invoiceTimestamp = new Date(invoice.timestamp);
-      } else {
-        // Assume it's already a Date object
-        invoiceTimestamp = new Date(invoice.timestamp);
-      }
-    } catch (e) {
-      console.error("Error parsing timestamp for invoice:", invoice, e);
-      return false; // Skip this invoice if timestamp is invalid
-    }
-
-    const matchesSearch = invoice.billNumber.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         (invoice.tableName && invoice.tableName.toLowerCase().includes(searchTerm.toLowerCase()));
-    
-    let matchesDate = true;
-    if (startDate) {
-      const start = new Date(startDate);
-      start.setHours(0, 0, 0, 0);
-      matchesDate = matchesDate && invoiceTimestamp >= start;
-    }
-    if (endDate) {
-      const end = new Date(endDate);
-      end.setHours(23, 59, 59, 999);
-      matchesDate = matchesDate && invoiceTimestamp <= end;
-    }
+  // Fetch the newest page for the selected dates, plus totals for the whole range
+  useEffect(() => {
+    const { from, to } = filterRange(startDate, endDate);
+    let cancelled = false;
+    Promise.all([api.getInvoicesPage({ from, to }), api.getReportSummary(from, to)])
+      .then(([page, rangeSummary]) => {
+        if (cancelled) return;
+        setInvoices(page.invoices);
+        setNextCursor(page.nextCursor);
+        setSummary(rangeSummary);
+      })
+      .catch(error => console.error("Error loading invoices:", error));
+    return () => {
+      cancelled = true;
+    };
+  }, [startDate, endDate]);
 
-    return matchesSearch && matchesDate;
-  });
+  // New bills show up at the top while the range is still open-ended
+  useEffect(() => {
+    if (endDate) return;
+    return api.subscribeToEvents((type, data) => {
+      if (type !== 'invoice.created') return;
+      setInvoices(prev => prev.some(invoice => invoice.id === data.id) ? prev : [data, ...prev]);
+      setSummary(prev => prev && {
+        ...prev,
+        totalRevenue: prev.totalRevenue + data.total,
+        totalOrders: prev.totalOrders + 1,
+        dineInOrders: prev.dineInOrders + (data.orderType === "dine-in" ? 1 : 0),
+        takeawayOrders: prev.takeawayOrders + (data.orderType === "takeaway" ? 1 : 0),
+      });
+    });
+  }, [endDate]);
 
-  const totalRevenue = filteredInvoices.reduce((sum: number, inv: Invoice) => {
-    // Handle potential NaN values
-    const total = isNaN(inv.total) ? 0 : inv.total;
-    return sum + total;
-  }, 0);
-  
-  const totalOrders = filteredInvoices.length;
-  const dineInOrders = filteredInvoices.filter((inv: Invoice) => inv.orderType === "dine-in").length;
-  const takeawayOrders = filteredInvoices.filter((inv: Invoice) => inv.orderType === "takeaway").length;
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await api.getInvoicesPage({ cursor: nextCursor, ...filterRange(startDate, endDate) });
+      setInvoices(prev => [...prev, ...page.invoices]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error("Error loading more invoices:", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
-  const printInvoice = (invoice: Invoice) => {
-    const billWindow = window.open('', '', 'width=300,height=600');
-    if (!billWindow) return;
+  // Search narrows the invoices loaded so far; the dates are applied by the server
+  const filteredInvoices = invoices.filter((invoice: Invoice) =>
+    invoice.billNumber.toLowerCase().includes(searchTerm.toLowerCase()) ||
+    (invoice.tableName && invoice.tableName.toLowerCase().includes(searchTerm.toLowerCase()))
+  );
 
-    const billContent = generateBillContent(invoice);
-    billWindow.document.write(billContent);
-    billWindow.document.close();
-    billWindow.print();
-  };
+  const totalRevenue = summary?.totalRevenue ?? 0;
+  const totalOrders = summary?.totalOrders ?? 0;
+  const dineInOrders = summary?.dineInOrders ?? 0;
+  const takeawayOrders = summary?.takeawayOrders ?? 0;
 
-  const generateBillContent = (invoice: Invoice) => {
-    // Handle timestamp conversion
-    let invoiceTimestamp: Date;
+  const printInvoice = async (invoice: Invoice) => {
+    // Same server-rendered bill as at checkout, in the configured layout;
+    // open the print window while still handling the click
+    const printWindow = openPrintWindow(billConfig.paperSize);
     try {
-      if (typeof invoice.timestamp === 'string') {
-        invoiceTimestamp = new Date(invoice.timestamp);
-      } else {
-        invoiceTimestamp = new Date(invoice.timestamp);
-      }
-    } catch (e) {
-      console.error("Error parsing timestamp for invoice:", invoice, e);
-      invoiceTimestamp = new Date();
+      printWindow.print(await api.getInvoicePrint(invoice.id));
+    } catch (error) {
+      printWindow.close();
+      console.error("Error printing invoice:", error);
     }
-
-    return `
-      <!DOCTYPE html>
-      <html>
-      <head>
-        <title>Bill - ${invoice.billNumber}</title>
-        <style>
-          @media print {
-            @page { margin: 0; size: 80mm auto; }
-          }
-          body {
-            width: 80mm;
-            font-family: 'Courier New', monospace;
-            font-size: 12px;
-            margin: 0;
-            padding: 10px;
-          }
-          .header { text-align: center; border-bottom: 2px dashed #000; padding-bottom: 10px; margin-bottom: 10px; }
-          .title { font-size: 18px; font-weight: bold; }
-          .info { margin: 10px 0; font-size: 11px; }
-          .info-row { display: flex; justify-content: space-between; margin: 3px 0; }
-          .items { border-top: 2px dashed #000; padding: 10px 0; }
-          .item-row { display: flex; justify-content: space-between; margin: 5px 0; }
-          .totals { border-top: 2px dashed #000; border-bottom: 2px dashed #000; padding: 10px 0; margin: 10px 0; }
-          .total-row { display: flex; justify-content: space-between; margin: 5px 0; }
-          .grand-total { font-size: 16px; font-weight: bold; margin-top: 10px; }
-          .footer { text-align: center; margin-top: 15px; font-size: 10px; }
-        </style>
-      </head>
-      <body>
-        <div class="header">
-          <div class="title">RESTAURANT POS</div>
-          <div>Tax Invoice</div>
-        </div>
-        <div class="info">
-          <div class="info-row"><span>Bill No:</span><span>${invoice.billNumber}</span></div>
-          <div class="info-row"><span>Date:</span><span>${invoiceTimestamp.toLocaleDateString()} ${invoiceTimestamp.toLocaleTimeString()}</span></div>
-          <div class="info-row"><span>Type:</span><span>${invoice.orderType.toUpperCase()}</span></div>
-          ${invoice.tableName ? `<div class="info-row"><span>Table:</span><span>${invoice.tableName}</span></div>` : ''}
-        </div>
-        <div class="items">
-          ${(invoice.items || []).map((item: OrderItem) => `
-            <div class="item-row">
-              <div style="flex: 2;">
-                <div>${item.name || 'Unknown Item'}</div>
-                <div style="font-size: 10px;">${item.quantity || 0} x ₹${(item.price || 0).toFixed(2)}</div>
-              </div>
-              <div style="text-align: right;">₹${((item.quantity || 0) * (item.price || 0)).toFixed(2)}</div>
-            </div>
-          `).join('')}
-        </div>
-        <div class="totals">
-          <div class="total-row"><span>Subtotal:</span><span>₹${(invoice.subtotal || 0).toFixed(2)}</span></div>
-          <div class="total-row"><span>GST (5%):</span><span>₹${(invoice.tax || 0).toFixed(2)}</span></div>
-          <div class="total-row grand-total"><span>TOTAL:</span><span>₹${(invoice.total || 0).toFixed(2)}</span></div>
-        </div>
-        <div class="footer">
-          <div>Thank you for dining with us!</div>
-          <div>Please visit again</div>
-        </div>
-      </body>
-      </html>
-    `;
   };
 
   const clearFilters = () => {
@@ -276,7 +231,7 @@ export function InvoicesPage() {
       {/* Invoices List */}
       <Card>
         <CardHeader>
-          <CardTitle>All Invoices ({filteredInvoices.length})</CardTitle>
+          <CardTitle>Invoices ({filteredInvoices.length} of {totalOrders})</CardTitle>
         </CardHeader>
         <CardContent>
           <ScrollArea className="h-[calc(100vh-500px)]">
@@ -349,6 +304,12 @@ export function InvoicesPage() {
                   <p>No invoices found</p>
                 </div>
               )}
+
+              {nextCursor && (
+                <Button variant="outline" onClick={loadMore} disabled={loadingMore} className="w-full">
+                  {loadingMore ? "Loading..." : "Load More"}
+                </Button>
+              )}
             </div>
           </ScrollArea>
         </CardContent>
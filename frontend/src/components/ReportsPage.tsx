@@ -1,85 +1,118 @@
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import { Card, CardContent, CardHeader, CardTitle } from "./ui/card";
 import { Button } from "./ui/button";
 import { Input } from "./ui/input";
 import { Label } from "./ui/label";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "./ui/tabs";
-import { Calendar, Download, TrendingUp, ShoppingBag, DollarSign } from "lucide-react";
-import { useRestaurant } from "../contexts/RestaurantContext";
+import { Calendar, Download, FileSpreadsheet, TrendingUp, ShoppingBag, DollarSign } from "lucide-react";
+import * as api from "../services/api";
+
+interface ReportData {
+  from: Date;
+  to?: Date;
+  totalRevenue: number;
+  totalOrders: number;
+  dineInOrders: number;
+  takeawayOrders: number;
+  dineInRevenue: number;
+  takeawayRevenue: number;
+  averageOrderValue: number;
+  topItems: { name: string; quantity: number; revenue: number }[];
+  categories: { name: string; quantity: number; revenue: number }[];
+}
+
+// Totals, the order type split and item sales come pre-aggregated from the
+// server instead of being computed from every invoice in the browser. Leave
+// out `to` for ranges running up to now, so the server can use its hourly
+// rollup and repeat requests hit its cache.
+const loadReport = async (from: Date, to?: Date): Promise<ReportData> => {
+  const [summary, topItems, categories] = await Promise.all([
+    api.getReportSummary(from, to),
+    api.getTopItems({ from, to }, "revenue", 5),
+    api.getSalesByCategory({ from, to })
+  ]);
+  return {
+    from,
+    to,
+    totalRevenue: summary.totalRevenue,
+    totalOrders: summary.totalOrders,
+    dineInOrders: summary.dineInOrders,
+    takeawayOrders: summary.takeawayOrders,
+    dineInRevenue: summary.dineInRevenue,
+    takeawayRevenue: summary.takeawayRevenue,
+    averageOrderValue: summary.averageOrderValue,
+    topItems: topItems.map(({ name, quantity, revenue }) => ({ name, quantity, revenue })),
+    categories: categories.map(({ name, quantity, revenue }) => ({ name, quantity, revenue })),
+  };
+};
+
+// Start of the local day after a YYYY-MM-DD date, the exclusive end of a range
+const dayAfter = (date: string) => {
+  const end = new Date(date + "T00:00:00");
+  end.setDate(end.getDate() + 1);
+  return end;
+};
 
 export function ReportsPage() {
-  const { invoices } = useRestaurant();
   const [customStartDate, setCustomStartDate] = useState("");
   const [customEndDate, setCustomEndDate] = useState("");
+  const [dailyReport, setDailyReport] = useState<ReportData | null>(null);
+  const [weeklyReport, setWeeklyReport] = useState<ReportData | null>(null);
+  const [monthlyReport, setMonthlyReport] = useState<ReportData | null>(null);
+  const [customReport, setCustomReport] = useState<ReportData | null>(null);
 
-  const today = new Date();
-  const startOfToday = new Date(today.getFullYear(), today.getMonth(), today.getDate());
-  const startOfWeek = new Date(today);
-  startOfWeek.setDate(today.getDate() - today.getDay());
-  startOfWeek.setHours(0, 0, 0, 0);
-  const startOfMonth = new Date(today.getFullYear(), today.getMonth(), 1);
-
-  const getReportData = (startDate: Date, endDate: Date) => {
-    const filtered = invoices.filter((inv: any) => {
-      const invDate = new Date(inv.timestamp);
-      return invDate >= startDate && invDate <= endDate;
-    });
+  const loadReports = async () => {
+    const today = new Date();
+    const startOfToday = new Date(today.getFullYear(), today.getMonth(), today.getDate());
+    const startOfWeek = new Date(startOfToday);
+    startOfWeek.setDate(startOfToday.getDate() - startOfToday.getDay());
+    const startOfMonth = new Date(today.getFullYear(), today.getMonth(), 1);
 
-    const totalRevenue = filtered.reduce((sum: number, inv: any) => sum + inv.total, 0);
-    const totalOrders = filtered.length;
-    const dineInOrders = filtered.filter((inv: any) => inv.orderType === "dine-in").length;
-    const takeawayOrders = filtered.filter((inv: any) => inv.orderType === "takeaway").length;
-    const dineInRevenue = filtered
-      .filter((inv: any) => inv.orderType === "dine-in")
-      .reduce((sum: number, inv: any) => sum + inv.total, 0);
-    const takeawayRevenue = filtered
-      .filter((inv: any) => inv.orderType === "takeaway")
-      .reduce((sum: number, inv: any) => sum + inv.total, 0);
-    const averageOrderValue = totalOrders > 0 ? totalRevenue / totalOrders : 0;
+    try {
+      const [daily, weekly, monthly] = await Promise.all([
+        loadReport(startOfToday),
+        loadReport(startOfWeek),
+        loadReport(startOfMonth)
+      ]);
+      setDailyReport(daily);
+      setWeeklyReport(weekly);
+      setMonthlyReport(monthly);
+    } catch (error) {
+      console.error("Error loading reports:", error);
+    }
+  };
 
-    // Get top selling items
-    const itemSales = new Map<string, { name: string; quantity: number; revenue: number }>();
-    filtered.forEach((inv: any) => {
-      inv.items.forEach((item: any) => {
-        const existing = itemSales.get(item.id);
-        if (existing) {
-          existing.quantity += item.quantity;
-          existing.revenue += item.price * item.quantity;
-        } else {
-          itemSales.set(item.id, {
-            name: item.name,
-            quantity: item.quantity,
-            revenue: item.price * item.quantity,
-          });
-        }
-      });
+  useEffect(() => {
+    loadReports();
+    // Refresh as new bills come in, coalescing bursts into a single reload
+    let reloadTimer: ReturnType<typeof setTimeout> | undefined;
+    const unsubscribe = api.subscribeToEvents((type) => {
+      if (type === 'invoice.created') {
+        clearTimeout(reloadTimer);
+        reloadTimer = setTimeout(loadReports, 2000);
+      }
     });
-
-    const topItems = Array.from(itemSales.values())
-      .sort((a, b) => b.revenue - a.revenue)
-      .slice(0, 5);
-
-    return {
-      totalRevenue,
-      totalOrders,
-      dineInOrders,
-      takeawayOrders,
-      dineInRevenue,
-      takeawayRevenue,
-      averageOrderValue,
-      topItems,
+    return () => {
+      clearTimeout(reloadTimer);
+      unsubscribe();
     };
-  };
+  }, []);
 
-  const dailyReport = getReportData(startOfToday, new Date());
-  const weeklyReport = getReportData(startOfWeek, new Date());
-  const monthlyReport = getReportData(startOfMonth, new Date());
-  
-  const customReport = customStartDate && customEndDate
-    ? getReportData(new Date(customStartDate), new Date(customEndDate + "T23:59:59"))
-    : null;
+  useEffect(() => {
+    setCustomReport(null);
+    if (!customStartDate || !customEndDate) return;
+    let cancelled = false;
+    loadReport(new Date(customStartDate + "T00:00:00"), dayAfter(customEndDate))
+      .then(report => {
+        if (!cancelled) setCustomReport(report);
+      })
+      .catch(error => console.error("Error loading custom report:", error));
+    return () => {
+      cancelled = true;
+    };
+  }, [customStartDate, customEndDate]);
 
-  const downloadReport = (data: ReturnType<typeof getReportData>, period: string) => {
+  const downloadReport = (data: ReportData, period: string) => {
     const content = `
 Restaurant POS - ${period} Sales Report
 Generated: ${new Date().toLocaleString()}
@@ -116,17 +149,42 @@ ${data.topItems.map((item, idx) => `${idx + 1}. ${item.name}
     URL.revokeObjectURL(url);
   };
 
-  const ReportCard = ({ data, title }: { data: ReturnType<typeof getReportData>; title: string }) => (
+  const downloadInvoices = async (data: ReportData, period: string) => {
+    try {
+      const blob = await api.exportInvoices(data.from, data.to);
+      const url = URL.createObjectURL(blob);
+      const a = document.createElement('a');
+      a.href = url;
+      a.download = `${period.toLowerCase().replace(/\s+/g, '-')}-invoices-${Date.now()}.xlsx`;
+      document.body.appendChild(a);
+      a.click();
+      document.body.removeChild(a);
+      URL.revokeObjectURL(url);
+    } catch (error) {
+      console.error("Error exporting invoices:", error);
+    }
+  };
+
+  const ReportCard = ({ data, title }: { data: ReportData | null; title: string }) => data ? (
     <div className="space-y-6">
       <div className="flex justify-between items-center">
         <h3 className="text-gray-900">{title}</h3>
-        <Button
-          onClick={() => downloadReport(data, title)}
-          variant="outline"
-        >
-          <Download className="size-4 mr-2" />
-          Download Report
-        </Button>
+        <div className="flex gap-2">
+          <Button
+            onClick={() => downloadInvoices(data, title)}
+            variant="outline"
+          >
+            <FileSpreadsheet className="size-4 mr-2" />
+            Export Invoices
+          </Button>
+          <Button
+            onClick={() => downloadReport(data, title)}
+            variant="outline"
+          >
+            <Download className="size-4 mr-2" />
+            Download Report
+          </Button>
+        </div>
       </div>
 
       {/* Stats Cards */}
@@ -223,7 +281,37 @@ ${data.topItems.map((item, idx) => `${idx + 1}. ${item.name}
           )}
         </CardContent>
       </Card>
+
+      {/* Sales by Category */}
+      <Card>
+        <CardHeader>
+          <CardTitle>Sales by Category</CardTitle>
+        </CardHeader>
+        <CardContent>
+          {data.categories.length > 0 ? (
+            <div className="space-y-3">
+              {data.categories.map((category) => (
+                <div key={category.name} className="flex items-center justify-between p-3 bg-gray-50 rounded-lg">
+                  <div>
+                    <p className="text-gray-900">{category.name}</p>
+                    <p className="text-muted-foreground">{category.quantity} sold</p>
+                  </div>
+                  <p style={{ color: '#0C3B2E' }}>₹{category.revenue.toFixed(2)}</p>
+                </div>
+              ))}
+            </div>
+          ) : (
+            <p className="text-center text-muted-foreground py-8">No sales data available</p>
+          )}
+        </CardContent>
+      </Card>
     </div>
+  ) : (
+    <Card>
+      <CardContent className="py-12 text-center text-muted-foreground">
+        <p>Loading report...</p>
+      </CardContent>
+    </Card>
   );
 
   return (
@@ -292,10 +380,10 @@ ${data.topItems.map((item, idx) => `${idx + 1}. ${item.name}
               </CardContent>
             </Card>
 
-            {customReport ? (
+            {customStartDate && customEndDate ? (
               <ReportCard
                 data={customReport}
-                title={`Custom Report (${new Date(customStartDate).toLocaleDateString()} - ${new Date(customEndDate).toLocaleDateString()})`}
+                title={`Custom Report (${new Date(customStartDate + "T00:00:00").toLocaleDateString()} - ${new Date(customEndDate + "T00:00:00").toLocaleDateString()})`}
               />
             ) : (
               <Card>
@@ -63,20 +63,23 @@ interface RestaurantContextType {
   getTableOrder: (tableId: string) => TableOrder | undefined;
   completeTableOrder: (tableId: string) => Promise<void>;
   markItemsAsSent: (tableId: string) => Promise<void>;
-  invoices: Invoice[];
-  addInvoice: (invoice: Invoice) => Promise<void>;
+  sendToKitchen: (tableId: string, tableName: string, items: OrderItem[]) => Promise<api.KOT | null>;
+  addInvoice: (invoice: Invoice) => Promise<Invoice | null>;
+  checkoutTable: (tableId: string) => Promise<Invoice | null>;
   kotConfig: KOTConfig;
   updateKotConfig: (config: KOTConfig) => Promise<void>;
   billConfig: BillConfig;
   updateBillConfig: (config: BillConfig) => Promise<void>;
 }
 
+// How often to refetch tables and orders changed through other server workers
+const FLOOR_REFRESH_MS = 30000;
+
 const RestaurantContext = React.createContext<RestaurantContextType | undefined>(undefined);
 
 export function RestaurantProvider({ children }: { children: React.ReactNode }) {
   const [tables, setTables] = React.useState<Table[]>([]);
   const [tableOrders, setTableOrders] = React.useState<Map<string, TableOrder>>(new Map());
-  const [invoices, setInvoices] = React.useState<Invoice[]>([]);
   const [kotConfig, setKotConfig] = React.useState<KOTConfig>({
     printByDepartment: false,
     numberOfCopies: 1,
@@ -92,33 +95,25 @@ export function RestaurantProvider({ children }: { children: React.ReactNode })
     formatType: null,
   });
 
+  // Load tables and their open orders in a single request
+  const loadFloor = async () => {
+    const floorData = await api.getFloor();
+    const ordersMap = new Map<string, TableOrder>();
+    const tablesData = floorData.map(({ order, ...table }) => {
+      if (order && order.items) {
+        ordersMap.set(table.id, order);
+      }
+      return table;
+    });
+    setTables(tablesData);
+    setTableOrders(ordersMap);
+  };
+
   // Load data from API on component mount
   React.useEffect(() => {
     const loadData = async () => {
       try {
-        // Load tables
-        const tablesData = await api.getTables();
-        setTables(tablesData);
-        
-        // Load all table orders from backend
-        const ordersMap = new Map<string, TableOrder>();
-        for (const table of tablesData) {
-          if (table.status === 'occupied') {
-            try {
-              const order = await api.getTableOrder(table.id);
-              if (order && order.items) {
-                ordersMap.set(table.id, order);
-              }
-            } catch (err) {
-              console.error(`Failed to load order for table ${table.id}:`, err);
-            }
-          }
-        }
-        setTableOrders(ordersMap);
-        
-        // Load invoices
-        const invoicesData = await api.getInvoices();
-        setInvoices(invoicesData);
+        await loadFloor();
         
         // Load configs
         const kotConfigData = await api.getKOTConfig();
@@ -145,6 +140,44 @@ export function RestaurantProvider({ children }: { children: React.ReactNode })
     loadData();
   }, []);
 
+  // Apply changes made on other terminals as they happen
+  React.useEffect(() => {
+    const unsubscribe = api.subscribeToEvents((type, data) => {
+      switch (type) {
+        case 'table.created':
+          setTables(prev => prev.some(table => table.id === data.id) ? prev : [...prev, data]);
+          break;
+        case 'table.updated':
+          setTables(prev => prev.map(table => table.id === data.id ? data : table));
+          break;
+        case 'table.deleted':
+          setTables(prev => prev.filter(table => table.id !== data.id));
+          break;
+        case 'order.updated':
+          setTableOrders(prev => new Map(prev).set(data.tableId, data));
+          break;
+        case 'order.completed':
+          setTableOrders(prev => {
+            const newMap = new Map(prev);
+            newMap.delete(data.tableId);
+            return newMap;
+          });
+          break;
+      }
+    });
+    return unsubscribe;
+  }, []);
+
+  // Events only reach terminals connected to the same server worker, so also
+  // refetch the floor now and then to pick up changes made through the others
+  React.useEffect(() => {
+    const interval = setInterval(() => {
+      if (document.hidden) return;
+      loadFloor().catch(error => console.error("Error refreshing tables:", error));
+    }, FLOOR_REFRESH_MS);
+    return () => clearInterval(interval);
+  }, []);
+
   const addItemsToTable = async (tableId: string, tableName: string, newItems: OrderItem[]) => {
     try {
       const updatedOrder = await api.addItemsToTable(tableId, tableName, newItems);
@@ -183,6 +216,28 @@ export function RestaurantProvider({ children }: { children: React.ReactNode })
     }
   };
 
+  const sendToKitchen = async (tableId: string, tableName: string, newItems: OrderItem[]) => {
+    try {
+      const { order, kot } = await api.sendKOT(tableId, tableName, newItems);
+
+      setTableOrders(prev => {
+        const newMap = new Map(prev);
+        newMap.set(tableId, order);
+        return newMap;
+      });
+
+      setTables(prev =>
+        prev.map(table =>
+          table.id === tableId ? { ...table, status: "occupied" } : table
+        )
+      );
+      return kot;
+    } catch (error) {
+      console.error("Error sending items to kitchen:", error);
+      return null;
+    }
+  };
+
   const getTableOrder = (tableId: string): TableOrder | undefined => {
     return tableOrders.get(tableId);
   };
@@ -210,11 +265,31 @@ export function RestaurantProvider({ children }: { children: React.ReactNode })
 
   const addInvoice = async (invoice: Invoice) => {
     try {
-      const newInvoice = await api.addInvoice(invoice);
-      
-      setInvoices(prev => [newInvoice, ...prev]);
+      return await api.addInvoice(invoice);
     } catch (error) {
       console.error("Error adding invoice:", error);
+      return null;
+    }
+  };
+
+  const checkoutTable = async (tableId: string) => {
+    try {
+      const invoice = await api.checkoutTable(tableId);
+
+      setTableOrders(prev => {
+        const newMap = new Map(prev);
+        newMap.delete(tableId);
+        return newMap;
+      });
+      setTables(prev =>
+        prev.map(table =>
+          table.id === tableId ? { ...table, status: "available" } : table
+        )
+      );
+      return invoice;
+    } catch (error) {
+      console.error("Error checking out table:", error);
+      return null;
     }
   };
 
@@ -248,8 +323,9 @@ export function RestaurantProvider({ children }: { children: React.ReactNode })
         getTableOrder,
         completeTableOrder,
         markItemsAsSent,
-        invoices,
+        sendToKitchen,
         addInvoice,
+        checkoutTable,
         kotConfig,
         updateKotConfig,
         billConfig,
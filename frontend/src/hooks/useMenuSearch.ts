@@ -0,0 +1,38 @@
+// src/hooks/useMenuSearch.ts
+import { useEffect, useState } from "react";
+import * as api from "../services/api";
+import { MenuItem } from "../types";
+
+const SEARCH_DEBOUNCE_MS = 150;
+
+// Server-side menu search for the order pages. Returns null while the query
+// is empty, so callers can fall back to browsing the loaded menu.
+export const useMenuSearch = (query: string, category: string): MenuItem[] | null => {
+  const [results, setResults] = useState<MenuItem[] | null>(null);
+
+  useEffect(() => {
+    const q = query.trim();
+    if (!q) {
+      setResults(null);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const items = await api.searchMenuItems(q, {
+          category: category === "All" ? undefined : category,
+          limit: 50,
+        });
+        if (!cancelled) setResults(items);
+      } catch (error) {
+        console.error("Error searching menu items:", error);
+      }
+    }, SEARCH_DEBOUNCE_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [query, category]);
+
+  return results;
+};
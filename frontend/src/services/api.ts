@@ -10,6 +10,44 @@ const getApiBaseUrl = () => {
 
 const API_BASE_URL = getApiBaseUrl();
 
+const WRITE_TIMEOUT_MS = 5000;
+const WRITE_ATTEMPTS = 4;
+
+// POST with an Idempotency-Key, retrying timeouts and network errors.
+// Every attempt sends the same key, so the server applies the write once.
+const postIdempotent = async (url: string, body: unknown): Promise<Response> => {
+  const key = crypto.randomUUID();
+  let lastError: unknown;
+  for (let attempt = 0; attempt < WRITE_ATTEMPTS; attempt++) {
+    if (attempt > 0) {
+      await new Promise((resolve) => setTimeout(resolve, 250 * 2 ** attempt));
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(() => controller.abort(), WRITE_TIMEOUT_MS);
+    try {
+      const response = await fetch(url, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'Idempotency-Key': key,
+        },
+        body: JSON.stringify(body),
+        signal: controller.signal,
+      });
+      // 409 means the first attempt is still being processed
+      if (response.status !== 409 && response.status < 500) {
+        return response;
+      }
+      lastError = new Error(`Request failed with status ${response.status}`);
+    } catch (error) {
+      lastError = error;
+    } finally {
+      clearTimeout(timer);
+    }
+  }
+  throw lastError;
+};
+
 export interface Table {
   id: string;
   name: string;
@@ -102,6 +140,15 @@ export const deleteTable = async (tableId: string): Promise<void> => {
   });
 };
 
+export interface FloorTable extends Table {
+  order: TableOrder | null;
+}
+
+export const getFloor = async (): Promise<FloorTable[]> => {
+  const response = await fetch(`${API_BASE_URL}/floor`);
+  return response.json();
+};
+
 // Order API
 export const getTableOrder = async (tableId: string): Promise<TableOrder | null> => {
   const response = await fetch(`${API_BASE_URL}/orders/table/${tableId}`);
@@ -109,15 +156,9 @@ export const getTableOrder = async (tableId: string): Promise<TableOrder | null>
 };
 
 export const addItemsToTable = async (tableId: string, tableName: string, items: OrderItem[]): Promise<TableOrder> => {
-  const response = await fetch(`${API_BASE_URL}/orders/table/${tableId}`, {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-    },
-    body: JSON.stringify({
-      table_name: tableName,
-      items,
-    }),
+  const response = await postIdempotent(`${API_BASE_URL}/orders/table/${tableId}`, {
+    table_name: tableName,
+    items,
   });
   return response.json();
 };
@@ -129,6 +170,56 @@ export const markItemsAsSent = async (tableId: string): Promise<TableOrder> => {
   return response.json();
 };
 
+export interface KOTTicket {
+  department: string | null;
+  copy: number;
+  items: OrderItem[];
+  // Ready-to-print HTML for the configured paper size and format
+  html: string;
+}
+
+export interface KOT {
+  kotNumber: string;
+  tableId: string;
+  tableName: string;
+  isAdditional: boolean;
+  timestamp: string;
+  paperSize: string | null;
+  formatType: string | null;
+  tickets: KOTTicket[];
+}
+
+// Add items and send everything pending to the kitchen in one request
+export const sendKOT = async (
+  tableId: string,
+  tableName: string,
+  items: OrderItem[]
+): Promise<{ order: TableOrder; kot: KOT }> => {
+  // Tickets print times in this terminal's zone
+  const tzOffset = -new Date().getTimezoneOffset();
+  const response = await postIdempotent(`${API_BASE_URL}/orders/table/${tableId}/kot?tzOffset=${tzOffset}`, {
+    table_name: tableName,
+    items,
+  });
+  if (!response.ok) {
+    throw new Error('Failed to send KOT');
+  }
+  return response.json();
+};
+
+// Send items not tied to a table (takeaway) to the kitchen
+export const sendTakeawayKOT = async (items: OrderItem[], isAdditional = false): Promise<KOT> => {
+  const tzOffset = -new Date().getTimezoneOffset();
+  const response = await postIdempotent(`${API_BASE_URL}/kot?tzOffset=${tzOffset}`, {
+    items,
+    is_additional: isAdditional,
+  });
+  if (!response.ok) {
+    throw new Error('Failed to send KOT');
+  }
+  return response.json();
+};
+
 export const completeTableOrder = async (tableId: string): Promise<void> => {
   await fetch(`${API_BASE_URL}/orders/table/${tableId}/complete`, {
     method: 'POST',
@@ -136,31 +227,208 @@ export const completeTableOrder = async (tableId: string): Promise<void> => {
 };
 
 // Invoice API
-export const getInvoices = async (): Promise<Invoice[]> => {
-  const response = await fetch(`${API_BASE_URL}/invoices`);
+export interface InvoicePage {
+  invoices: Invoice[];
+  nextCursor: string | null;
+}
+
+export const getInvoicesPage = async (
+  options: { cursor?: string | null; limit?: number; from?: Date; to?: Date } = {}
+): Promise<InvoicePage> => {
+  const params = new URLSearchParams({ limit: String(options.limit ?? 50) });
+  if (options.cursor) params.set('cursor', options.cursor);
+  if (options.from) params.set('from', options.from.toISOString());
+  if (options.to) params.set('to', options.to.toISOString());
+  const response = await fetch(`${API_BASE_URL}/invoices?${params.toString()}`);
   return response.json();
 };
 
 export const addInvoice = async (invoice: Omit<Invoice, 'id'>): Promise<Invoice> => {
-  const response = await fetch(`${API_BASE_URL}/invoices`, {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-    },
-    body: JSON.stringify({
-      billNumber: invoice.billNumber,
-      orderType: invoice.orderType,
-      tableName: invoice.tableName,
-      items: invoice.items,
-      subtotal: invoice.subtotal,
-      tax: invoice.tax,
-      total: invoice.total,
-      timestamp: invoice.timestamp,
-    }),
+  // The server assigns the bill number; use the one in the response
+  const response = await postIdempotent(`${API_BASE_URL}/invoices`, {
+    orderType: invoice.orderType,
+    tableName: invoice.tableName,
+    items: invoice.items,
+    subtotal: invoice.subtotal,
+    tax: invoice.tax,
+    total: invoice.total,
+    timestamp: invoice.timestamp,
   });
   return response.json();
 };
 
+// Ready-to-print bill HTML for an invoice
+export const getInvoicePrint = async (invoiceId: string): Promise<string> => {
+  const tzOffset = -new Date().getTimezoneOffset();
+  const response = await fetch(`${API_BASE_URL}/invoices/${invoiceId}/print?tzOffset=${tzOffset}`);
+  if (!response.ok) {
+    throw new Error('Failed to render invoice');
+  }
+  return response.text();
+};
+
+// Bill a table's order at the configured tax rate and free the table
+export const checkoutTable = async (tableId: string): Promise<Invoice> => {
+  const response = await postIdempotent(`${API_BASE_URL}/orders/table/${tableId}/checkout`, {});
+  if (!response.ok) {
+    throw new Error('Failed to check out table');
+  }
+  return response.json();
+};
+
+// Reports API
+export interface ReportBucket {
+  orders: number;
+  subtotal: number;
+  tax: number;
+  revenue: number;
+}
+
+export interface ReportSummary {
+  from: string | null;
+  to: string | null;
+  orderType: string;
+  totalRevenue: number;
+  totalOrders: number;
+  totalSubtotal: number;
+  totalTax: number;
+  averageOrderValue: number;
+  dineInOrders: number;
+  dineInRevenue: number;
+  takeawayOrders: number;
+  takeawayRevenue: number;
+  byOrderType: Record<string, ReportBucket>;
+  hourly: { hour: number; orders: number; revenue: number }[];
+  peakHour: number | null;
+}
+
+export const getReportSummary = async (
+  from?: Date,
+  to?: Date,
+  orderType: "all" | "dine-in" | "takeaway" = "all"
+): Promise<ReportSummary> => {
+  const params = new URLSearchParams({
+    orderType,
+    tzOffset: String(-new Date().getTimezoneOffset()),
+  });
+  if (from) params.set('from', from.toISOString());
+  if (to) params.set('to', to.toISOString());
+  const response = await fetch(`${API_BASE_URL}/reports/summary?${params.toString()}`);
+  return response.json();
+};
+
+// Analytics API
+export interface AnalyticsRange {
+  from?: Date;
+  to?: Date;
+  orderType?: "all" | "dine-in" | "takeaway";
+}
+
+export interface ItemSales {
+  menuItemId: string | null;
+  name: string;
+  productCode: string | null;
+  quantity: number;
+  revenue: number;
+  orders: number;
+}
+
+export interface GroupSales {
+  name: string;
+  quantity: number;
+  revenue: number;
+  orders: number;
+}
+
+const analyticsParams = (range: AnalyticsRange) => {
+  const params = new URLSearchParams({
+    orderType: range.orderType ?? 'all',
+    tzOffset: String(-new Date().getTimezoneOffset()),
+  });
+  if (range.from) params.set('from', range.from.toISOString());
+  if (range.to) params.set('to', range.to.toISOString());
+  return params;
+};
+
+export const getTopItems = async (
+  range: AnalyticsRange = {},
+  by: "quantity" | "revenue" = "revenue",
+  limit = 10
+): Promise<ItemSales[]> => {
+  const params = analyticsParams(range);
+  params.set('by', by);
+  params.set('limit', String(limit));
+  const response = await fetch(`${API_BASE_URL}/analytics/top-items?${params.toString()}`);
+  return (await response.json()).items;
+};
+
+export const getSalesByCategory = async (range: AnalyticsRange = {}): Promise<GroupSales[]> => {
+  const response = await fetch(`${API_BASE_URL}/analytics/categories?${analyticsParams(range).toString()}`);
+  return (await response.json()).categories;
+};
+
+// Live updates (Server-Sent Events)
+export type ServerEventType =
+  | 'table.created'
+  | 'table.updated'
+  | 'table.deleted'
+  | 'order.updated'
+  | 'order.completed'
+  | 'invoice.created';
+
+const SERVER_EVENT_TYPES: ServerEventType[] = [
+  'table.created',
+  'table.updated',
+  'table.deleted',
+  'order.updated',
+  'order.completed',
+  'invoice.created',
+];
+// How long to wait before reopening a stream the server turned away
+const EVENTS_RETRY_MS = 30000;
+
+type ServerEventListener = (type: ServerEventType, data: any) => void;
+
+// Every component in a tab shares one stream, since each open stream holds a
+// server thread for as long as it stays open
+const eventListeners = new Set<ServerEventListener>();
+let eventSource: EventSource | null = null;
+let eventRetry: ReturnType<typeof setTimeout> | null = null;
+
+const openEventSource = () => {
+  const source = new EventSource(`${API_BASE_URL}/events`);
+  SERVER_EVENT_TYPES.forEach(type => {
+    source.addEventListener(type, (event) => {
+      const data = JSON.parse((event as MessageEvent).data);
+      eventListeners.forEach(listener => listener(type, data));
+    });
+  });
+  source.onerror = () => {
+    // The browser reconnects dropped streams by itself but gives up on error
+    // responses such as a 503 when every stream slot is taken
+    if (source.readyState !== EventSource.CLOSED || eventSource !== source) return;
+    eventSource = null;
+    eventRetry = setTimeout(() => {
+      eventRetry = null;
+      if (eventListeners.size > 0) eventSource = openEventSource();
+    }, EVENTS_RETRY_MS);
+  };
+  return source;
+};
+
+export const subscribeToEvents = (onEvent: ServerEventListener): (() => void) => {
+  eventListeners.add(onEvent);
+  if (!eventSource && !eventRetry) eventSource = openEventSource();
+  return () => {
+    eventListeners.delete(onEvent);
+    if (eventListeners.size > 0) return;
+    eventSource?.close();
+    eventSource = null;
+    if (eventRetry) clearTimeout(eventRetry);
+    eventRetry = null;
+  };
+};
+
 // Config API
 export const getKOTConfig = async (): Promise<KOTConfig> => {
   const response = await fetch(`${API_BASE_URL}/config/kot`);
@@ -242,6 +510,17 @@ export const getMenuItems = async (): Promise<MenuItem[]> => {
   return response.json();
 };
 
+export const searchMenuItems = async (
+  query: string,
+  options: { category?: string; department?: string; limit?: number } = {}
+): Promise<MenuItem[]> => {
+  const params = new URLSearchParams({ q: query, limit: String(options.limit ?? 20) });
+  if (options.category) params.set('category', options.category);
+  if (options.department) params.set('department', options.department);
+  const response = await fetch(`${API_BASE_URL}/menu-items/search?${params.toString()}`);
+  return (await response.json()).items;
+};
+
 export const createMenuItem = async (item: Omit<MenuItem, 'id'>): Promise<MenuItem> => {
   const response = await fetch(`${API_BASE_URL}/menu-items`, {
     method: 'POST',
@@ -364,6 +643,14 @@ export const exportMenuData = async (): Promise<Blob> => {
   return response.blob();
 };
 
+export const exportInvoices = async (from?: Date, to?: Date): Promise<Blob> => {
+  const params = new URLSearchParams();
+  if (from) params.set('from', from.toISOString());
+  if (to) params.set('to', to.toISOString());
+  const response = await fetch(`${API_BASE_URL}/invoices/export?${params.toString()}`);
+  return response.blob();
+};
+
 export const importMenuData = async (file: File): Promise<{ success: boolean; message: string; stats: any }> => {
   const formData = new FormData();
   formData.append('file', file);
@@ -0,0 +1,55 @@
+// Print server-rendered bill and KOT HTML on the local printer
+
+const WINDOW_WIDTHS: Record<string, number> = {
+  "58mm": 300,
+  "80mm": 400,
+  "112mm": 500,
+};
+
+export interface PrintWindow {
+  print: (html: string | string[]) => void;
+  close: () => void;
+}
+
+// Several documents rendered in the same layout, one per printed page
+const combineDocuments = (documents: string[]) => {
+  const parser = new DOMParser();
+  const pages = documents.map(html => parser.parseFromString(html, "text/html"));
+  const body = pages
+    .map(page => `<div class="print-page">${page.body.innerHTML}</div>`)
+    .join("");
+  return `<!doctype html><html><head>${pages[0].head.innerHTML}` +
+    `<style>.print-page:not(:last-child) { page-break-after: always; }</style>` +
+    `</head><body>${body}</body></html>`;
+};
+
+// Browsers only allow a popup while handling a click, and waiting on the
+// network first uses that up, so open the window straight away and print
+// into it once the server has rendered the document
+export const openPrintWindow = (paperSize?: string | null): PrintWindow => {
+  const width = WINDOW_WIDTHS[paperSize || "80mm"] || WINDOW_WIDTHS["80mm"];
+  const popup = window.open("", "_blank", `width=${width},height=600`);
+  popup?.document.write("<p>Preparing to print...</p>");
+
+  return {
+    print: (html) => {
+      if (!popup || popup.closed) return;
+      const documents = Array.isArray(html) ? html : [html];
+      if (!documents.length) {
+        popup.close();
+        return;
+      }
+
+      // The document carries its own @page size and layout for the paper
+      popup.document.open();
+      popup.document.write(documents.length === 1 ? documents[0] : combineDocuments(documents));
+      popup.document.close();
+
+      setTimeout(() => {
+        popup.print();
+        popup.close();
+      }, 200);
+    },
+    close: () => popup?.close(),
+  };
+};